@@ -28,14 +28,27 @@ DEBUG = False
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
+            'formatter': 'plain',
         },
     },
     'root': {
         'handlers': ['console'],
-        'level': 'DEBUG',
+        'level': os.environ.get("LOG_LEVEL", "WARNING"),
+    },
+    'loggers': {
+        # App diagnostics (check-in distances etc.) and the per-request JSON lines
+        # from attendance.instrumentation are DEBUG; set ATTENDANCE_LOG_LEVEL=DEBUG to see them
+        'attendance': {
+            'level': os.environ.get("ATTENDANCE_LOG_LEVEL", "INFO"),
+        },
     },
 }
 
@@ -55,6 +68,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'attendance.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,20 +98,82 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'Attendance_Tracker.wsgi.application'
+ASGI_APPLICATION = 'Attendance_Tracker.asgi.application'
+
+# Serve check-in/check-out from the async-ORM views (set when running under uvicorn/daphne)
+ASYNC_CHECK_IN = os.environ.get("ASYNC_CHECK_IN", "").lower() in ("1", "true", "yes")
+
+# Write-behind check-ins: validated check-ins are queued in a local SQLite file and
+# bulk-inserted by a background flusher, so a lecture-start rush doesn't serialize
+# on the main database's write lock. Drain manually with `manage.py flush_check_ins`.
+CHECK_IN_WRITE_BEHIND = os.environ.get("CHECK_IN_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+CHECK_IN_QUEUE_PATH = os.environ.get("CHECK_IN_QUEUE_PATH", BASE_DIR / "checkin_queue.sqlite3")
+CHECK_IN_FLUSH_INTERVAL_MS = int(os.environ.get("CHECK_IN_FLUSH_INTERVAL_MS", "200"))
+
+# Offline check-in sync (POST /attendance/check-in/sync/, see attendance/sync.py):
+# per-upload limits and how old a queued check-in may be when it finally arrives.
+CHECK_IN_SYNC_MAX_EVENTS = int(os.environ.get("CHECK_IN_SYNC_MAX_EVENTS", "5000"))
+CHECK_IN_SYNC_MAX_BYTES = int(os.environ.get("CHECK_IN_SYNC_MAX_BYTES", str(16 * 1024 * 1024)))
+CHECK_IN_SYNC_MAX_AGE_HOURS = int(os.environ.get("CHECK_IN_SYNC_MAX_AGE_HOURS", "72"))
+
+# SQLite only: closed semesters moved out by `manage.py archive_records` live in this
+# file, attached to every connection when it exists. (PostgreSQL partitions by month.)
+ATTENDANCE_ARCHIVE_PATH = os.environ.get("ATTENDANCE_ARCHIVE_PATH", BASE_DIR / "attendance_archive.sqlite3")
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite performance profile (on unless SQLITE_TUNING=0): WAL so check-ins don't block
+# readers, PRAGMAs applied per connection by attendance/sqlite_tuning.py, and
+# BEGIN IMMEDIATE for every atomic block so a read-then-write transaction (check_in's
+# get_or_create) waits on busy_timeout instead of failing with "database is locked".
+SQLITE_TUNING = os.environ.get("SQLITE_TUNING", "1").lower() in ("1", "true", "yes")
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",                     # WAL + NORMAL: durable except on power loss
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "15000")),  # under gunicorn's 30 s timeout
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,                    # KiB when negative → 64 MB page cache
+    "temp_store": "MEMORY",
+} if SQLITE_TUNING else {}
+SQLITE_OPTIONS = {"transaction_mode": "IMMEDIATE"} if SQLITE_TUNING else {}
+
+# PostgreSQL connection pool (on unless DB_POOL=0): each worker process keeps
+# psycopg_pool connections open and lends one per request, instead of holding one
+# persistent connection per thread. Size it so workers × DB_POOL_MAX_SIZE stays
+# under the server's max_connections. Pooling needs CONN_MAX_AGE=0 (Django
+# refuses both); with CONN_HEALTH_CHECKS Django gives the pool a `check`, so a
+# connection the server dropped while idle is discarded before it reaches a request.
+DB_POOL = os.environ.get("DB_POOL", "1").lower() in ("1", "true", "yes")
+DB_POOL_OPTIONS = {
+    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),      # seconds to wait for a free connection
+    "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),   # close extra idle connections after this
+    "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", "1800")),
+}
+
+
+def postgres_database(url, ssl_require=True):
+    """DATABASES entry for `url`: pooled with DB_POOL_OPTIONS, else one persistent connection per thread."""
+    database = dj_database_url.parse(
+        url,
+        conn_max_age=0 if DB_POOL else 600,
+        conn_health_checks=True,
+        ssl_require=ssl_require,
+    )
+    if DB_POOL:
+        database.setdefault("OPTIONS", {})["pool"] = dict(DB_POOL_OPTIONS)
+    return database
 
 
 if os.getenv("DATABASE_URL"):
     # Production (e.g. Render)
     DATABASES = {
-        'default': dj_database_url.config(
-            default=os.getenv("DATABASE_URL"),
-            conn_max_age=600,
-            ssl_require=True
+        'default': postgres_database(
+            os.getenv("DATABASE_URL"),
+            ssl_require=os.environ.get("DB_SSL_REQUIRE", "1").lower() in ("1", "true", "yes"),
         )
     }
 else:
@@ -106,11 +182,69 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': SQLITE_OPTIONS,
         }
     }
 
 
 
+# Cache
+# The Location catalogue's version stamp is shared by every worker, so a Location
+# edit in one gunicorn worker is seen by all of them on the next request. Set
+# REDIS_URL to keep it (and everything else below) in Redis instead of the database.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("REDIS_URL"),
+        }
+    }
+    LOCATION_CACHE_ALIAS = 'default'
+    WEBAUTHN_CHALLENGE_STORE = 'cache'
+    WEBAUTHN_CHALLENGE_CACHE_ALIAS = 'default'
+    PAGE_STAMP_CACHE_ALIAS = 'default'
+    # Sessions read from Redis, written through to the database
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+else:
+    # No cache server: what every worker must agree on goes through the database
+    # (the cache table is created by migration 0010), the rest stays in per-process
+    # memory. WebAuthn challenges get their own table, out of reach of the stamps' churn.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'attendance_shared_cache',
+        },
+    }
+    LOCATION_CACHE_ALIAS = 'shared'
+    WEBAUTHN_CHALLENGE_STORE = 'database'
+    PAGE_STAMP_CACHE_ALIAS = 'shared'
+
+# WebAuthn challenges are kept out of the session (see attendance/challenges.py) but
+# must still be shared by every worker: begin and check-in may hit different ones.
+# Set WEBAUTHN_CHALLENGE_STORE = 'local' for the per-process store (single worker only).
+WEBAUTHN_CHALLENGE_TTL = int(os.getenv("WEBAUTHN_CHALLENGE_TTL", "120"))
+# Usernameless-login challenges an anonymous client may request per minute
+# (counted in the 'default' cache, so per worker without REDIS_URL)
+WEBAUTHN_LOGIN_RATE = int(os.getenv("WEBAUTHN_LOGIN_RATE", "10"))
+
+# Admin dashboard, student list and records pages are cached here, keyed by
+# per-model "last modified" stamps (see attendance/pagecache.py). The stamps go to
+# PAGE_STAMP_CACHE_ALIAS, shared by every worker (the database cache table without
+# REDIS_URL), so a change made through one worker is seen by all of them.
+PAGE_CACHE_ALIAS = 'default'
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", "300"))
+
+
+# Instrumentation
+# Fraction of requests whose timing, SQL and response size are recorded
+# (Prometheus text at /attendance/metrics/, with the rate as a gauge, plus one
+# DEBUG-level JSON log line each). 1.0 records every request.
+INSTRUMENTATION_SAMPLE_RATE = float(os.getenv("INSTRUMENTATION_SAMPLE_RATE", "0.01"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
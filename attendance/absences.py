@@ -0,0 +1,87 @@
+import datetime
+
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.db.models.constants import OnConflict
+
+from .archive import is_archived
+from .models import AttendanceRecord, Student
+from .pagecache import RECORD, touch
+from .stats import record_sessions
+from .summary import bump_daily_summary
+
+BATCH_SIZE = 1000
+
+
+def _mark_absent_sql():
+    record, student = AttendanceRecord._meta, Student._meta
+    qn = connection.ops.quote_name
+    fields = [record.get_field("student"), record.get_field("date")]
+
+    insert = connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)
+    suffix = connection.ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None)
+    returning = f" RETURNING {qn('student_id')}" if connection.features.can_return_rows_from_bulk_insert else ""
+    return (
+        f"{insert} {qn(record.db_table)} ({qn('student_id')}, {qn('date')}, {qn('status')}) "
+        f"SELECT s.{qn('id')}, %s, %s FROM {qn(student.db_table)} s "
+        f"WHERE NOT EXISTS ("
+        f"SELECT 1 FROM {qn(record.db_table)} r "
+        f"WHERE r.{qn('student_id')} = s.{qn('id')} AND r.{qn('date')} = %s"
+        f") {suffix}{returning}"
+    )
+
+
+def _mark_absent(cursor, sql, day):
+    """Insert the day's Absent records; returns the ids of the students who got one."""
+    value = connection.ops.adapt_datefield_value(day)
+    if connection.features.can_return_rows_from_bulk_insert:
+        cursor.execute(sql, [value, "Absent", value])
+        return [student_id for student_id, in cursor.fetchall()]
+    # No RETURNING: the rows this transaction just inserted are the Absent ones past the old max id
+    last = AttendanceRecord.objects.aggregate(last=Max("pk"))["last"] or 0
+    cursor.execute(sql, [value, "Absent", value])
+    return list(AttendanceRecord.objects.filter(pk__gt=last, date=day, status="Absent")
+                .values_list("student_id", flat=True))
+
+
+def _count_absences(student_ids, day):
+    """Each absent student's session, and the day's absences per department, for exactly these students."""
+    for start in range(0, len(student_ids), BATCH_SIZE):
+        batch = student_ids[start:start + BATCH_SIZE]
+        record_sessions(batch, day, present=False)
+        departments = Student.objects.filter(pk__in=batch).values("department").annotate(n=Count("pk")).order_by()
+        for row in departments:
+            bump_daily_summary(day, None, row["department"], absent=row["n"])
+
+
+def close_day(start, end=None, skip_weekends=False):
+    """
+    Insert an Absent record for every student with no record on each date in
+    [start, end], using one INSERT ... SELECT ... WHERE NOT EXISTS per day.
+    Students who check in concurrently are left alone (conflicts are ignored).
+    Returns the number of Absent records created. Only the rows actually
+    inserted (INSERT ... RETURNING where supported) are counted, in StudentStats
+    and as per-department bumps to the day's summary.
+
+    This is the scheduler hook: call close_day(timezone.localdate()) from cron,
+    Celery beat, etc. after the last lecture, or use `manage.py close_day`.
+    """
+    end = end or start
+    if is_archived(start):
+        raise ValueError(f"{start} is in an archived semester; its records are read-only.")
+    sql = _mark_absent_sql()
+    created = 0
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            day = start
+            while day <= end:
+                if not (skip_weekends and day.weekday() >= 5):
+                    student_ids = _mark_absent(cursor, sql, day)
+                    _count_absences(student_ids, day)
+                    created += len(student_ids)
+                day += datetime.timedelta(days=1)
+
+        touch(RECORD)
+
+    return created
@@ -0,0 +1,191 @@
+import datetime
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import AttendanceHistory, AttendanceRecord
+from .pagecache import RECORD, touch
+
+# SQLite can't partition, so closed semesters are moved into a separate database
+# file (ATTENDANCE_ARCHIVE_PATH) attached to every connection as "archive".
+# AttendanceHistory reads a TEMP view that UNION ALLs the live and archived rows;
+# record_queryset() picks it only when the requested dates reach into the archive,
+# so day-to-day queries keep hitting the live table alone.
+#
+# The view is created lazily, never on connection setup: a view referencing
+# attendance_attendancerecord makes Django's SQLite table rebuilds (migrations) fail.
+# Connections opened before the archive existed (persistent ones) attach it on first use.
+#
+# The cutoff is cached per process and re-read only when the archive file changes,
+# so asking "does this range reach the archive?" costs a stat(), not a query.
+ARCHIVE_SCHEMA = "archive"
+PERIOD_TABLE = "attendance_archive_period"
+
+_cutoffs = {}  # archive path → (file signature, archived_before)
+
+
+def archive_path():
+    return getattr(settings, "ATTENDANCE_ARCHIVE_PATH", None)
+
+
+def _columns(qn):
+    return ", ".join(qn(field.column) for field in AttendanceRecord._meta.concrete_fields)
+
+
+def _archive_table_sql(conn):
+    # Same columns and types as the live table, but no foreign keys: they can't reference another database
+    qn = conn.ops.quote_name
+    columns = [
+        f"{qn(field.column)} {field.db_type(conn)}{' PRIMARY KEY' if field.primary_key else ''}"
+        for field in AttendanceRecord._meta.concrete_fields
+    ]
+    return (f"CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.{qn(AttendanceRecord._meta.db_table)} "
+            f"({', '.join(columns)})")
+
+
+def attach_archive(conn=connection, create=False):
+    """ATTACH the archive file to this SQLite connection (creating it if `create`). Returns whether it is attached."""
+    path = archive_path()
+    if conn.vendor != "sqlite" or not path or not (create or os.path.exists(path)):
+        return False
+    if not getattr(conn, "attendance_archive_attached", False):
+        with conn.cursor() as cursor:
+            cursor.execute(f"ATTACH DATABASE %s AS {ARCHIVE_SCHEMA}", [str(path)])
+        conn.attendance_archive_attached = True
+    return True
+
+
+def detach_archive(conn=connection):
+    if getattr(conn, "attendance_archive_attached", False):
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP VIEW IF EXISTS temp.{AttendanceHistory._meta.db_table}")
+            cursor.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+        conn.attendance_archive_attached = False
+
+
+def attach_archive_on_connect(sender, connection, **kwargs):
+    """connection_created receiver: a fresh connection has nothing attached yet."""
+    connection.attendance_archive_attached = False
+    attach_archive(connection)
+
+
+def _signature(path):
+    # The -wal file too: in WAL mode a commit may not touch the main file until a checkpoint
+    signature = []
+    for name in (path, f"{path}-wal"):
+        try:
+            stat = os.stat(name)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature) if signature[0] else None
+
+
+def _read_cutoff(cursor, schema=""):
+    cursor.execute(f"SELECT 1 FROM {schema}sqlite_master WHERE type = 'table' AND name = '{PERIOD_TABLE}'")
+    if cursor.fetchone() is None:
+        return None
+    cursor.execute(f"SELECT MAX(archived_before) FROM {schema}{PERIOD_TABLE}")
+    value = cursor.fetchone()[0]
+    return parse_date(value) if value else None
+
+
+def archived_before(conn=connection):
+    """Records dated before this day live in the archive (None when nothing is archived)."""
+    path = archive_path()
+    if conn.vendor != "sqlite" or not path:
+        return None
+    if conn.in_atomic_block and getattr(conn, "attendance_archive_attached", False):
+        # This transaction may have archived a period it hasn't committed: ask it, don't cache
+        with conn.cursor() as cursor:
+            return _read_cutoff(cursor, f"{ARCHIVE_SCHEMA}.")
+    signature = _signature(path)
+    if signature is None:
+        return None
+    cached = _cutoffs.get(str(path))
+    if cached is None or cached[0] != signature:
+        with closing(sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)) as db:
+            cached = _cutoffs[str(path)] = (signature, _read_cutoff(db.cursor()))
+    return cached[1]
+
+
+def _ensure_history_view(conn):
+    qn = conn.ops.quote_name
+    columns, table = _columns(qn), qn(AttendanceRecord._meta.db_table)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMP VIEW IF NOT EXISTS {qn(AttendanceHistory._meta.db_table)} AS "
+            f"SELECT {columns} FROM main.{table} UNION ALL SELECT {columns} FROM {ARCHIVE_SCHEMA}.{table}"
+        )
+
+
+def record_queryset(start=None, end=None, conn=connection, archived=True):
+    """
+    Records, optionally filtered to date__range=[start, end], including archived
+    ones when the range starts before the archive cutoff. archived=False keeps to
+    the live table (the current semester) whatever the range. On PostgreSQL the
+    table is partitioned instead, so this is always plain AttendanceRecord.
+    """
+    first = start
+    if isinstance(start, str):
+        try:
+            first = parse_date(start)
+        except ValueError:
+            first = None
+    cutoff = archived_before(conn) if archived else None
+    if cutoff is not None and (first is None or first < cutoff) and attach_archive(conn):
+        _ensure_history_view(conn)
+        queryset = AttendanceHistory.objects.all()
+    else:
+        queryset = AttendanceRecord.objects.all()
+    if start and end:
+        queryset = queryset.filter(date__range=[start, end])
+    return queryset
+
+
+def is_archived(date, conn=connection):
+    cutoff = archived_before(conn)
+    return cutoff is not None and date < cutoff
+
+
+def archive_records(before, conn=connection):
+    """
+    Move every record dated before `before` (e.g. the first day of the current
+    semester) into the archive database, in one transaction. Returns rows moved.
+    Summaries and StudentStats stay in the main database untouched.
+    """
+    if conn.vendor != "sqlite":
+        raise ValueError("Archiving is for SQLite; on PostgreSQL old months are separate partitions already.")
+    if before > timezone.localdate():
+        raise ValueError("Only days that are over can be archived.")
+    if not attach_archive(conn, create=True):
+        raise ValueError("Set ATTENDANCE_ARCHIVE_PATH to archive records.")
+
+    qn = conn.ops.quote_name
+    columns, table = _columns(qn), qn(AttendanceRecord._meta.db_table)
+    value = conn.ops.adapt_datefield_value(before)
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        cursor.execute(_archive_table_sql(conn))
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.attendance_archive_date_idx "
+                       f"ON {AttendanceRecord._meta.db_table} (date, check_in)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.attendance_archive_student_idx "
+                       f"ON {AttendanceRecord._meta.db_table} (student_id, date, status)")
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.{PERIOD_TABLE} "
+                       f"(archived_before DATE NOT NULL, archived_at DATETIME NOT NULL, records INTEGER NOT NULL)")
+
+        cursor.execute(f"INSERT INTO {ARCHIVE_SCHEMA}.{table} ({columns}) "
+                       f"SELECT {columns} FROM main.{table} WHERE date < %s", [value])
+        cursor.execute(f"DELETE FROM main.{table} WHERE date < %s", [value])
+        moved = max(cursor.rowcount, 0)
+        cursor.execute(f"INSERT INTO {ARCHIVE_SCHEMA}.{PERIOD_TABLE} VALUES (%s, %s, %s)",
+                       [value, datetime.datetime.now(datetime.timezone.utc).isoformat(), moved])
+        touch(RECORD)
+    _cutoffs.pop(str(archive_path()), None)
+    return moved
@@ -0,0 +1,82 @@
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .geofence import GeofenceIndex
+
+VERSION_KEY = "attendance:locations:version"
+
+
+class LocationCatalogue:
+    """Snapshot of every Location plus the geofence index built over them."""
+
+    def __init__(self, locations, version):
+        self.version = version
+        self.locations = list(locations)
+        self.index = GeofenceIndex(self.locations)
+
+    def get(self, location_id):
+        return self.index.get(location_id)
+
+
+# ---------------- PER-WORKER INSTANCE ----------------
+# Each worker keeps its own catalogue in memory. When LOCATION_CACHE_ALIAS names
+# a Django cache, that cache holds a version stamp shared by all workers: every
+# lookup compares stamps (one cache GET) and reloads from the database if
+# another worker changed a Location, so a stale radius never outlives a request.
+_catalogue = None
+_local_version = uuid.uuid4().hex
+_lock = threading.Lock()
+
+
+def _shared_cache():
+    alias = getattr(settings, "LOCATION_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def _current_version():
+    shared = _shared_cache()
+    if shared is None:
+        return _local_version
+
+    version = shared.get(VERSION_KEY)
+    if version is None:
+        # First worker up (or the key was evicted) — publish a stamp everyone agrees on
+        shared.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = shared.get(VERSION_KEY)
+    return version
+
+
+def get_location_catalogue():
+    """Return this worker's catalogue, reloading it if the version stamp moved."""
+    global _catalogue
+    version = _current_version()
+    catalogue = _catalogue
+    if catalogue is None or catalogue.version != version:
+        from .models import Location
+
+        with _lock:
+            if _catalogue is None or _catalogue.version != version:
+                _catalogue = LocationCatalogue(Location.objects.all(), version)
+            catalogue = _catalogue
+    return catalogue
+
+
+def get_geofence_index():
+    return get_location_catalogue().index
+
+
+def invalidate_location_catalogue():
+    """Drop this worker's catalogue now and bump the shared stamp once the change commits."""
+    global _catalogue, _local_version
+    with _lock:
+        _catalogue = None
+        _local_version = uuid.uuid4().hex
+
+    shared = _shared_cache()
+    if shared is not None:
+        # Bumping before commit would let other workers reload the old rows under the new stamp
+        transaction.on_commit(lambda: shared.set(VERSION_KEY, uuid.uuid4().hex, timeout=None))
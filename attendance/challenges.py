@@ -0,0 +1,204 @@
+import datetime
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .models import WebAuthnChallenge
+
+# WebAuthn challenges live here instead of request.session, so issuing and
+# consuming one never touches django_session: they go to Redis, or without
+# REDIS_URL to their own WebAuthnChallenge table, which no cache culling or
+# other cached data can evict them from. Challenges are keyed by (purpose, user
+# id), expire after a TTL and can be popped exactly once: a replayed assertion
+# finds nothing to verify against.
+REGISTER = "register"
+AUTHENTICATE = "authenticate"  # popped by check_in / check_in_async
+VERIFY = "verify"  # popped by webauthn_authenticate_complete for a signed-in student
+LOGIN = "login"  # usernameless login: keyed by the challenge itself, there is no user yet
+KEY_PREFIX = "attendance:webauthn"
+DEFAULT_TTL = 120  # seconds; the browser prompt itself times out after 60
+MAX_LOCAL_ENTRIES = 50000
+LOGIN_RATE = 10  # anonymous login challenges per client per minute
+
+
+def _key(purpose, user_id):
+    return f"{KEY_PREFIX}:{purpose}:{user_id}"
+
+
+class LocalChallengeStore:
+    """
+    Per-process store (WEBAUTHN_CHALLENGE_STORE = "local") for single-worker
+    deployments only: another worker can't pop what this one put. Every entry
+    gets the same TTL, so insertion order is expiry order: put() sweeps expired
+    entries off the front of the dict, touching only what it removes.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=MAX_LOCAL_ENTRIES, clock=time.monotonic):
+        self.ttl, self.max_entries, self.clock = ttl, max_entries, clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _sweep(self, now):
+        entries = self._entries
+        while entries:
+            key = next(iter(entries))
+            if entries[key][0] > now and len(entries) <= self.max_entries:
+                break
+            del entries[key]
+
+    def put(self, purpose, user_id, challenge):
+        key, now = _key(purpose, user_id), self.clock()
+        with self._lock:
+            self._entries.pop(key, None)  # re-issuing moves it to the back
+            self._entries[key] = (now + self.ttl, challenge)
+            self._sweep(now)
+
+    async def aput(self, purpose, user_id, challenge):
+        self.put(purpose, user_id, challenge)
+
+    def pop(self, purpose, user_id):
+        with self._lock:
+            entry = self._entries.pop(_key(purpose, user_id), None)
+        if entry is None or entry[0] <= self.clock():
+            return None
+        return entry[1]
+
+    async def apop(self, purpose, user_id):
+        return self.pop(purpose, user_id)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheChallengeStore:
+    """
+    Shared store on a Django cache (Redis when REDIS_URL is set), for several
+    workers. The cache expires entries itself. pop() only returns the value if
+    its own delete() removed the key, so concurrent pops can't both succeed.
+    """
+
+    def __init__(self, cache, ttl=DEFAULT_TTL):
+        self.cache, self.ttl = cache, ttl
+
+    def put(self, purpose, user_id, challenge):
+        self.cache.set(_key(purpose, user_id), challenge, timeout=self.ttl)
+
+    async def aput(self, purpose, user_id, challenge):
+        await self.cache.aset(_key(purpose, user_id), challenge, timeout=self.ttl)
+
+    def pop(self, purpose, user_id):
+        key = _key(purpose, user_id)
+        challenge = self.cache.get(key)
+        if challenge is None or not self.cache.delete(key):
+            return None
+        return challenge
+
+    async def apop(self, purpose, user_id):
+        key = _key(purpose, user_id)
+        challenge = await self.cache.aget(key)
+        if challenge is None or not await self.cache.adelete(key):
+            return None
+        return challenge
+
+
+class DatabaseChallengeStore:
+    """
+    Shared store on the WebAuthnChallenge table, for several workers without a
+    cache server. put() is one upsert; pop() only returns the challenge if its
+    own delete removed the row. Expired rows are swept at most once per TTL by
+    each process, so the table holds roughly one TTL's worth of challenges.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, clock=timezone.now):
+        self.ttl, self.clock = ttl, clock
+        self._next_sweep = None
+
+    def _row(self, purpose, user_id, challenge):
+        now = self.clock()
+        return now, WebAuthnChallenge(key=_key(purpose, user_id), challenge=challenge,
+                                      expires_at=now + datetime.timedelta(seconds=self.ttl))
+
+    def _sweep_due(self, now):
+        if self._next_sweep is not None and now < self._next_sweep:
+            return False
+        self._next_sweep = now + datetime.timedelta(seconds=self.ttl)
+        return True
+
+    def put(self, purpose, user_id, challenge):
+        now, row = self._row(purpose, user_id, challenge)
+        WebAuthnChallenge.objects.bulk_create(
+            [row], update_conflicts=True, unique_fields=["key"], update_fields=["challenge", "expires_at"]
+        )
+        if self._sweep_due(now):
+            WebAuthnChallenge.objects.filter(expires_at__lte=now).delete()
+
+    async def aput(self, purpose, user_id, challenge):
+        now, row = self._row(purpose, user_id, challenge)
+        await WebAuthnChallenge.objects.abulk_create(
+            [row], update_conflicts=True, unique_fields=["key"], update_fields=["challenge", "expires_at"]
+        )
+        if self._sweep_due(now):
+            await WebAuthnChallenge.objects.filter(expires_at__lte=now).adelete()
+
+    def pop(self, purpose, user_id):
+        key = _key(purpose, user_id)
+        challenge = (WebAuthnChallenge.objects.filter(key=key, expires_at__gt=self.clock())
+                     .values_list("challenge", flat=True).first())
+        if challenge is None or not WebAuthnChallenge.objects.filter(key=key, challenge=challenge).delete()[0]:
+            return None
+        return challenge
+
+    async def apop(self, purpose, user_id):
+        key = _key(purpose, user_id)
+        challenge = await (WebAuthnChallenge.objects.filter(key=key, expires_at__gt=self.clock())
+                           .values_list("challenge", flat=True).afirst())
+        if challenge is None or not (await WebAuthnChallenge.objects.filter(key=key, challenge=challenge).adelete())[0]:
+            return None
+        return challenge
+
+
+def login_challenge_allowed(client):
+    """
+    Count one usernameless-login challenge for `client` (its address) and say
+    whether it is within WEBAUTHN_LOGIN_RATE for the current minute, so an
+    anonymous flood can't fill the challenge store.
+    """
+    cache = caches["default"]
+    key = f"{KEY_PREFIX}:login-rate:{client}:{int(time.time() // 60)}"
+    cache.add(key, 0, timeout=60)
+    try:
+        count = cache.incr(key)
+    except ValueError:  # expired between add() and incr()
+        count = 1
+    return count <= getattr(settings, "WEBAUTHN_LOGIN_RATE", LOGIN_RATE)
+
+
+_store = None
+_store_config = None
+_lock = threading.Lock()
+
+
+def get_challenge_store():
+    """
+    This process's store: WEBAUTHN_CHALLENGE_STORE is "cache" (the
+    WEBAUTHN_CHALLENGE_CACHE_ALIAS cache), "database" or "local".
+    """
+    global _store, _store_config
+    alias = getattr(settings, "WEBAUTHN_CHALLENGE_CACHE_ALIAS", None)
+    config = (getattr(settings, "WEBAUTHN_CHALLENGE_STORE", "cache" if alias else "local"), alias,
+              getattr(settings, "WEBAUTHN_CHALLENGE_TTL", DEFAULT_TTL))
+    if _store is None or _store_config != config:
+        with _lock:
+            if _store is None or _store_config != config:
+                kind, alias, ttl = config
+                if kind == "database":
+                    _store = DatabaseChallengeStore(ttl)
+                elif kind == "cache":
+                    _store = CacheChallengeStore(caches[alias], ttl)
+                else:
+                    _store = LocalChallengeStore(ttl)
+                _store_config = config
+    return _store
@@ -0,0 +1,76 @@
+import base64
+import binascii
+import json
+
+from .models import WebAuthnCredential, credential_id_hash
+
+# An assertion names the credential it was made with (rawId), so the credential,
+# and through it the student, is found with one lookup on the unique
+# credential_id_hash index. That works without knowing the user first, which is
+# what usernameless (discoverable credential) login needs.
+
+
+def b64url_encode(b: bytes) -> str:
+    return base64.urlsafe_b64encode(b).rstrip(b'=').decode('ascii')
+
+
+def b64url_decode(s: str) -> bytes:
+    padding = '=' * ((4 - len(s) % 4) % 4)
+    return base64.urlsafe_b64decode(s + padding)
+
+
+def _as_dict(assertion):
+    if isinstance(assertion, (str, bytes)):
+        try:
+            assertion = json.loads(assertion)
+        except ValueError:
+            return None
+    return assertion if isinstance(assertion, dict) else None
+
+
+def assertion_credential_id(assertion):
+    """Raw ID of the credential an assertion (dict or JSON text) was made with, or None."""
+    assertion = _as_dict(assertion)
+    encoded = assertion and (assertion.get("rawId") or assertion.get("id"))
+    if not isinstance(encoded, str):
+        return None
+    try:
+        return b64url_decode(encoded) or None
+    except (ValueError, binascii.Error):
+        return None
+
+
+def assertion_challenge(assertion):
+    """The challenge the authenticator signed (from clientDataJSON), base64url-encoded, or None."""
+    assertion = _as_dict(assertion)
+    try:
+        client_data = json.loads(b64url_decode(assertion["response"]["clientDataJSON"]))
+        return client_data["challenge"] if isinstance(client_data["challenge"], str) else None
+    except (TypeError, KeyError, ValueError, binascii.Error):
+        return None
+
+
+def _lookup(assertion):
+    credential_id = assertion_credential_id(assertion)
+    if credential_id is None:
+        return None
+    return WebAuthnCredential.objects.select_related("student__user").filter(
+        credential_id_hash=credential_id_hash(credential_id)
+    )
+
+
+def find_credential(assertion):
+    """The registered credential (with its student) an assertion was made with, or None."""
+    queryset = _lookup(assertion)
+    return queryset.first() if queryset is not None else None
+
+
+async def afind_credential(assertion):
+    queryset = _lookup(assertion)
+    return await queryset.afirst() if queryset is not None else None
+
+
+def find_credentials(credential_ids):
+    """{credential_id_hash: credential} for many raw IDs, in one query."""
+    hashes = {credential_id_hash(credential_id) for credential_id in credential_ids}
+    return {c.credential_id_hash: c for c in WebAuthnCredential.objects.filter(credential_id_hash__in=hashes)}
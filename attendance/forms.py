@@ -29,3 +29,10 @@ class AttendanceRecordForm(forms.ModelForm):
 class DateRangeForm(forms.Form):
     start_date = forms.DateField(required=True, widget=forms.DateInput(attrs={'type': 'date'}))
     end_date = forms.DateField(required=True, widget=forms.DateInput(attrs={'type': 'date'}))
+
+
+class StudentImportForm(forms.Form):
+    roster = forms.FileField(
+        help_text="CSV or XLSX with matric_no, first_name, last_name and department columns.",
+        widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,.xlsx"}),
+    )
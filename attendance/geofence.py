@@ -0,0 +1,106 @@
+import math
+
+from .utils import calculate_distance, calculate_distances
+
+METERS_PER_DEGREE = 111320  # length of one degree of latitude (≈ constant)
+MIN_CELL_SIZE = 50  # meters, so tiny radii don't explode the bucket count
+
+
+class GeofenceIndex:
+    """
+    In-memory grid index over Location geofences.
+
+    The globe is cut into square-ish cells whose side is the largest
+    `allowed_radius` in the catalogue. Each geofence is registered in every
+    cell its circle's bounding box touches, so a point lookup only has to
+    check the handful of geofences stored in its own cell.
+    """
+
+    def __init__(self, locations):
+        self.locations = {}
+        self.buckets = {}
+
+        locations = list(locations)
+        largest = max((loc.allowed_radius for loc in locations), default=0)
+        self.cell_size = max(float(largest), MIN_CELL_SIZE) / METERS_PER_DEGREE
+
+        for loc in locations:
+            self.add(loc)
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_size), math.floor(lon / self.cell_size))
+
+    def add(self, location):
+        lat, lon = float(location.latitude), float(location.longitude)
+        radius = float(location.allowed_radius)
+
+        # Bounding box of the geofence in degrees (longitude shrinks with latitude)
+        d_lat = radius / METERS_PER_DEGREE
+        d_lon = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+
+        lat_lo, lon_lo = self._cell(lat - d_lat, lon - d_lon)
+        lat_hi, lon_hi = self._cell(lat + d_lat, lon + d_lon)
+
+        entry = (location, lat, lon, radius)
+        self.locations[location.pk] = entry
+        for i in range(lat_lo, lat_hi + 1):
+            for j in range(lon_lo, lon_hi + 1):
+                self.buckets.setdefault((i, j), []).append(entry)
+
+    def get(self, location_id):
+        """Return the Location with this id, or None."""
+        try:
+            entry = self.locations[int(location_id)]
+        except (KeyError, TypeError, ValueError):
+            return None
+        return entry[0]
+
+    def match(self, lat, lon):
+        """
+        Return (location, distance) for the closest geofence containing the
+        point, or (None, None) if the point is outside every geofence.
+        """
+        lat, lon = float(lat), float(lon)
+        best, best_distance = None, None
+
+        for location, loc_lat, loc_lon, radius in self.buckets.get(self._cell(lat, lon), ()):
+            distance = calculate_distance(lat, lon, loc_lat, loc_lon)
+            if distance <= radius and (best_distance is None or distance < best_distance):
+                best, best_distance = location, distance
+
+        return best, best_distance
+
+    def match_many(self, points, location_ids=None):
+        """
+        match() for many (lat, lon) points, with every candidate distance computed
+        in one vectorized calculate_distances() call. Where location_ids gives an
+        id, the point is only checked against that geofence (like a picked lab).
+        Returns a list of (location, distance), (None, None) where nothing matched.
+        """
+        location_ids = location_ids or [None] * len(points)
+        owners, candidates = [], []
+        for i, ((lat, lon), location_id) in enumerate(zip(points, location_ids)):
+            if location_id:
+                entries = [self.locations[int(location_id)]] if self.get(location_id) is not None else []
+            else:
+                entries = self.buckets.get(self._cell(float(lat), float(lon)), ())
+            owners.extend([i] * len(entries))
+            candidates.extend(entries)
+
+        results = [(None, None)] * len(points)
+        if not candidates:
+            return results
+        distances = calculate_distances(
+            [float(points[i][0]) for i in owners], [float(points[i][1]) for i in owners],
+            [entry[1] for entry in candidates], [entry[2] for entry in candidates],
+        )
+        for i, (location, _, _, radius), distance in zip(owners, candidates, distances):
+            distance = float(distance)
+            best = results[i][1]
+            if distance <= radius and (best is None or distance < best):
+                results[i] = (location, distance)
+        return results
+
+    def __len__(self):
+        return len(self.locations)
+
@@ -0,0 +1,141 @@
+import csv
+import io
+import time
+import zipfile
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import Student
+from .pagecache import STUDENT, touch
+
+DEFAULT_PASSWORD = "password1"  # same initial credential StudentCreateView hands out
+ROSTER_COLUMNS = ["matric_no", "first_name", "last_name", "department"]
+BATCH_SIZE = 1000
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+
+def read_roster(fileobj, filename):
+    """Yield roster rows (dicts keyed by ROSTER_COLUMNS) from a CSV or XLSX upload."""
+    if filename.lower().endswith(".xlsx"):
+        yield from _read_xlsx(fileobj)
+    else:
+        yield from _read_csv(fileobj)
+
+
+def _read_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    try:
+        for row in reader:
+            yield {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+    except UnicodeDecodeError:
+        raise ValueError("The roster is not UTF-8 text; save it as CSV (UTF-8) or XLSX.")
+    except csv.Error as e:
+        raise ValueError(f"Line {reader.line_num}: not a valid CSV roster ({e}).")
+
+
+def _read_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ValueError("XLSX rosters need the openpyxl package; upload a CSV instead.")
+
+    try:
+        sheet = load_workbook(fileobj, read_only=True, data_only=True).active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(cell or "").strip().lower() for cell in next(rows, ())]
+        for values in rows:
+            yield {key: str(value if value is not None else "").strip() for key, value in zip(header, values) if key}
+    except (zipfile.BadZipFile, InvalidFileException, KeyError):
+        # A renamed or damaged file: not a zip, or a zip without a workbook in it
+        raise ValueError("The roster is not a readable XLSX workbook; save it again as XLSX or CSV.")
+
+
+def _too_long(row):
+    """The first of the other roster columns whose value doesn't fit its Student field, if any."""
+    for column in ROSTER_COLUMNS[1:]:
+        if len(row.get(column) or "") > Student._meta.get_field(column).max_length:
+            return column
+    return None
+
+
+def import_students(rows, password=DEFAULT_PASSWORD, batch_size=BATCH_SIZE):
+    """
+    Validate roster rows and create a User + Student for each new matric number.
+
+    Matric numbers already taken (as a Student or as a username) are checked in
+    a single query; the shared initial password is hashed once and reused for
+    every account. Inserts are batched with bulk_create in one transaction, so
+    a failed import leaves nothing behind.
+    """
+    started = time.perf_counter()
+    result = ImportResult()
+
+    valid, seen = [], set()
+    for line, row in enumerate(rows, start=2):  # line 1 is the header
+        matric_no = row.get("matric_no", "")
+        if not matric_no:
+            result.errors.append(f"Line {line}: missing matric_no")
+        elif len(matric_no) > Student._meta.get_field("matric_no").max_length:
+            result.errors.append(f"Line {line}: matric_no '{matric_no}' is too long")
+        elif too_long := _too_long(row):
+            result.errors.append(f"Line {line}: {too_long} is longer than "
+                                 f"{Student._meta.get_field(too_long).max_length} characters")
+        elif matric_no in seen:
+            result.errors.append(f"Line {line}: duplicate matric_no '{matric_no}' in file")
+        else:
+            seen.add(matric_no)
+            valid.append((line, row))
+
+    taken = set(User.objects.filter(username__in=seen).values_list("username", flat=True))
+    taken |= set(Student.objects.filter(matric_no__in=seen).values_list("matric_no", flat=True))
+
+    password_hash = make_password(password)
+
+    with transaction.atomic():
+        for start in range(0, len(valid), batch_size):
+            batch = []
+            for line, row in valid[start:start + batch_size]:
+                if row["matric_no"] in taken:
+                    result.errors.append(f"Line {line}: matric_no '{row['matric_no']}' already exists")
+                    continue
+                batch.append(row)
+
+            users = User.objects.bulk_create([
+                User(
+                    username=row["matric_no"],
+                    password=password_hash,
+                    first_name=row.get("first_name", ""),
+                    last_name=row.get("last_name", ""),
+                )
+                for row in batch
+            ])
+            Student.objects.bulk_create([
+                Student(
+                    user=user,
+                    matric_no=row["matric_no"],
+                    first_name=row.get("first_name") or "Unknown",
+                    last_name=row.get("last_name") or "Unknown",
+                    department=row.get("department", ""),
+                )
+                for user, row in zip(users, batch)
+            ])
+            result.created += len(batch)
+        touch(STUDENT)
+
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,150 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger("attendance.instrumentation")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """Measurements for the request being handled."""
+
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+# Set by the middleware for sampled requests only. A ContextVar (not a
+# thread-local) so queries run through sync_to_async in async views still count.
+current_stats = contextvars.ContextVar("attendance_request_stats", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper: times queries while a sampled request is active."""
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install_query_wrapper(connection, **kwargs):
+    """connection_created receiver: attach record_query to every new DB connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class ViewMetrics:
+    __slots__ = ("responses", "buckets", "duration", "queries", "db_time", "response_bytes")
+
+    def __init__(self):
+        self.responses = {}  # (method, status) -> count
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """
+    Per-process, in-memory totals per view. Each gunicorn/uvicorn worker keeps
+    its own registry, so Prometheus should scrape workers individually or sum
+    them. Counts only cover sampled requests; see the sample_rate gauge.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view, method, status, duration, queries, db_time, response_bytes):
+        with self._lock:
+            metrics = self._views.get(view)
+            if metrics is None:
+                metrics = self._views[view] = ViewMetrics()
+            key = (method, status)
+            metrics.responses[key] = metrics.responses.get(key, 0) + 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    metrics.buckets[i] += 1
+            metrics.duration += duration
+            metrics.queries += queries
+            metrics.db_time += db_time
+            metrics.response_bytes += response_bytes
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self, sample_rate=1.0):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = [
+                "# HELP attendance_instrumentation_sample_rate Fraction of requests measured.",
+                "# TYPE attendance_instrumentation_sample_rate gauge",
+                f"attendance_instrumentation_sample_rate {sample_rate}",
+                "# HELP attendance_view_requests_total Sampled requests by view, method and status.",
+                "# TYPE attendance_view_requests_total counter",
+            ]
+            for view, m in views:
+                for (method, status), count in sorted(m.responses.items()):
+                    lines.append(f'attendance_view_requests_total{{view="{_escape(view)}",method="{method}",'
+                                 f'status="{status}"}} {count}')
+
+            lines += [
+                "# HELP attendance_view_duration_seconds Wall time per sampled request.",
+                "# TYPE attendance_view_duration_seconds histogram",
+            ]
+            for view, m in views:
+                label = _escape(view)
+                count = sum(m.responses.values())
+                for bound, bucket in zip(LATENCY_BUCKETS, m.buckets):
+                    lines.append(f'attendance_view_duration_seconds_bucket{{view="{label}",le="{bound}"}} {bucket}')
+                lines.append(f'attendance_view_duration_seconds_bucket{{view="{label}",le="+Inf"}} {count}')
+                lines.append(f'attendance_view_duration_seconds_sum{{view="{label}"}} {m.duration:.6f}')
+                lines.append(f'attendance_view_duration_seconds_count{{view="{label}"}} {count}')
+
+            for name, help_text, attr, fmt in (
+                ("attendance_view_db_queries_total", "SQL queries run by sampled requests.", "queries", "{}"),
+                ("attendance_view_db_seconds_total", "Time spent in SQL by sampled requests.", "db_time", "{:.6f}"),
+                ("attendance_view_response_bytes_total", "Response body bytes of sampled requests.",
+                 "response_bytes", "{}"),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for view, m in views:
+                    lines.append(f'{name}{{view="{_escape(view)}"}} ' + fmt.format(getattr(m, attr)))
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+def log_request(view, method, path, status, duration, stats, response_bytes):
+    """One structured (JSON) log line per sampled request, only when DEBUG is enabled."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(json.dumps({
+            "event": "request",
+            "view": view,
+            "method": method,
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "queries": stats.queries,
+            "db_ms": round(stats.db_time * 1000, 2),
+            "bytes": response_bytes,
+        }))
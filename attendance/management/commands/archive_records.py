@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from attendance.archive import archive_path, archive_records
+
+
+class Command(BaseCommand):
+    help = (
+        "SQLite: move every attendance record dated before --before (e.g. the first day "
+        "of this semester) into the archive database at ATTENDANCE_ARCHIVE_PATH. Archived "
+        "records stay readable through the record lists, export and reports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", required=True, help="First day to keep live (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        before = parse_date(options["before"])
+        if before is None:
+            raise CommandError("--before must be YYYY-MM-DD.")
+
+        try:
+            moved = archive_records(before)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} records dated before {before} to {archive_path()}."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from attendance.absences import close_day
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark every student without a record as Absent for a day (default: today), "
+        "or back-fill a date range. Schedule it after the last lecture, e.g. "
+        "'0 20 * * 1-5 python manage.py close_day'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Day to close (YYYY-MM-DD); defaults to today")
+        parser.add_argument("--start", help="First day of a back-fill range (YYYY-MM-DD)")
+        parser.add_argument("--end", help="Last day of a back-fill range (YYYY-MM-DD)")
+        parser.add_argument("--skip-weekends", action="store_true", help="Don't mark Saturdays and Sundays")
+
+    def handle(self, *args, **options):
+        if options["start"] or options["end"]:
+            if not (options["start"] and options["end"]) or options["date"]:
+                raise CommandError("Use --start and --end together, without --date.")
+            start, end = parse_date(options["start"]), parse_date(options["end"])
+        elif options["date"]:
+            start = end = parse_date(options["date"])
+        else:
+            start = end = timezone.localdate()
+
+        if not start or not end or start > end:
+            raise CommandError("Dates must be YYYY-MM-DD and the range must not be reversed.")
+
+        try:
+            created = close_day(start, end, skip_weekends=options["skip_weekends"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Marked {created} absences from {start} to {end}."))
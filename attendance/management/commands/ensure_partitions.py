@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from attendance.partitions import MONTHS_AHEAD, ensure_partitions, is_partitioned
+
+
+class Command(BaseCommand):
+    help = (
+        "PostgreSQL: create the monthly attendance record partitions up to --months-ahead "
+        "months from now, moving any rows that fell into the DEFAULT partition. Schedule "
+        "it monthly, e.g. '0 3 1 * * python manage.py ensure_partitions'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+
+    def handle(self, *args, **options):
+        if not is_partitioned(connection):
+            raise CommandError(
+                "The attendance record table isn't partitioned (PostgreSQL only); "
+                "on SQLite use archive_records for closed semesters."
+            )
+        created = ensure_partitions(options["months_ahead"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(created)} partitions{': ' + ', '.join(created) if created else ''}."
+        ))
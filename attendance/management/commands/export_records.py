@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from attendance.exporters import (
+    CHUNK_SIZE, COLUMNS, COMPRESSION, FORMATS, PARTITION_LAYOUTS, write_export, write_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Export attendance records between --start and --end as typed Parquet or Arrow IPC "
+        "for analytics, streaming chunk by chunk. With --partition-by, --output is a directory "
+        "laid out as date=YYYY-MM-DD/ or month=YYYY-MM/ subfolders. Needs pyarrow."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", required=True, help="First day (YYYY-MM-DD)")
+        parser.add_argument("--end", required=True, help="Last day (YYYY-MM-DD)")
+        parser.add_argument("--output", required=True, help="File, or directory with --partition-by")
+        parser.add_argument("--format", choices=list(FORMATS), default="parquet")
+        parser.add_argument("--columns", help=f"Comma-separated subset of: {', '.join(COLUMNS)}")
+        parser.add_argument("--partition-by", choices=PARTITION_LAYOUTS)
+        parser.add_argument("--compression", default=COMPRESSION, help="zstd, lz4, snappy (Parquet) or none")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per batch / row group")
+
+    def handle(self, *args, **options):
+        start, end = parse_date(options["start"]), parse_date(options["end"])
+        if not start or not end or start > end:
+            raise CommandError("Dates must be YYYY-MM-DD and the range must not be reversed.")
+
+        compression = None if options["compression"] == "none" else options["compression"]
+        kwargs = {"columns": options["columns"], "chunk_size": options["chunk_size"], "compression": compression}
+        try:
+            if options["partition_by"]:
+                written = write_partitioned(options["output"], options["format"], start, end,
+                                            layout=options["partition_by"], **kwargs)
+                rows, files = sum(written.values()), len(written)
+            else:
+                rows, files = write_export(options["output"], options["format"], start, end, **kwargs), 1
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {rows} records from {start} to {end} into {files} {options['format']} file(s) at {options['output']}."
+        ))
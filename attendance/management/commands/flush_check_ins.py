@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from attendance.writebehind import CheckInQueue, flush_check_ins
+
+
+class Command(BaseCommand):
+    help = "Write every queued (write-behind) check-in into AttendanceRecord."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        queue = CheckInQueue(settings.CHECK_IN_QUEUE_PATH)
+        total = 0
+        while True:
+            flushed = flush_check_ins(queue, options["batch_size"])
+            if not flushed:
+                break
+            total += flushed
+        self.stdout.write(self.style.SUCCESS(f"Flushed {total} queued check-ins ({len(queue)} still leased)."))
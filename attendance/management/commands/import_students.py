@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.importers import BATCH_SIZE, DEFAULT_PASSWORD, import_students, read_roster
+
+
+class Command(BaseCommand):
+    help = "Bulk-import students (and their login accounts) from a CSV or XLSX roster."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Roster file with matric_no, first_name, last_name, department columns")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Initial password for every new account")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            with open(path, "rb") as fileobj:
+                result = import_students(
+                    read_roster(fileobj, path),
+                    password=options["password"],
+                    batch_size=options["batch_size"],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} students in {result.elapsed:.2f}s "
+            f"({result.rows_per_second:.0f} rows/s, {len(result.errors)} skipped)."
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from attendance.summary import rebuild_daily_summary
+
+
+class Command(BaseCommand):
+    help = "Rebuild DailyAttendanceSummary rows from the raw attendance records."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date to rebuild (YYYY-MM-DD)")
+        parser.add_argument("--end", help="Last date to rebuild (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        start, end = options["start"], options["end"]
+        if bool(start) != bool(end):
+            raise CommandError("Pass both --start and --end, or neither to rebuild everything.")
+
+        if start:
+            start, end = parse_date(start), parse_date(end)
+            if not start or not end:
+                raise CommandError("Dates must be in YYYY-MM-DD format.")
+
+        count = rebuild_daily_summary(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily summary rows."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.stats import find_stale_student_stats, rebuild_student_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-student attendance counters (sessions, days present, streak, "
+        "last check-in) and monthly rollup from the raw records. Run after back-filling or editing old records."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true",
+                            help="Only report students whose counters have drifted; exit 1 if any")
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            stale = find_stale_student_stats()
+            if stale:
+                raise CommandError(f"{len(stale)} students have stale counters, e.g. ids {stale[:10]}.")
+            self.stdout.write(self.style.SUCCESS("All student counters match the attendance records."))
+            return
+
+        count = rebuild_student_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {count} students."))
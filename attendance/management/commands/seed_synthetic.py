@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from attendance.synthetic import BATCH_SIZE, clear_synthetic, seed_synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic students, locations around the campus labs and days of "
+        "attendance with bulk_create, for benchmarking. Never run it against production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=1000)
+        parser.add_argument("--locations", type=int, default=10)
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--start", help="First day (YYYY-MM-DD); defaults to --days before today")
+        parser.add_argument("--present-rate", type=float, default=0.8)
+        parser.add_argument("--seed", type=int, default=42, help="Random seed, for repeatable data")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--clear", action="store_true", help="Delete earlier synthetic data first")
+
+    def handle(self, *args, **options):
+        start = None
+        if options["start"]:
+            start = parse_date(options["start"])
+            if start is None:
+                raise CommandError("--start must be YYYY-MM-DD.")
+        if min(options["students"], options["locations"], options["days"]) < 0:
+            raise CommandError("Counts must not be negative.")
+
+        if options["clear"]:
+            clear_synthetic()
+
+        result = seed_synthetic(
+            options["students"], options["locations"], options["days"], start=start,
+            present_rate=options["present_rate"], seed=options["seed"], batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {result.students} students, {result.locations} locations and "
+            f"{result.records} records in {result.elapsed:.2f}s."
+        ))
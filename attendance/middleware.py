@@ -0,0 +1,63 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .instrumentation import RequestStats, current_stats, log_request, registry
+
+
+class InstrumentationMiddleware:
+    """
+    Measure wall time, SQL query count, SQL time and response size per view for
+    a sample of requests (INSTRUMENTATION_SAMPLE_RATE), feeding the Prometheus
+    registry and a structured log line. Unsampled requests pay one random().
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "INSTRUMENTATION_SAMPLE_RATE", 0.01)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        stats, start = RequestStats(), time.perf_counter()
+        token = current_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self._record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        stats, start = RequestStats(), time.perf_counter()
+        token = current_stats.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self._record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def _record(self, request, response, stats, duration):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "<unresolved>"
+        # Streaming bodies (CSV export) are not buffered, so their size is unknown here
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(view, request.method, response.status_code, duration, stats.queries, stats.db_time, size)
+        log_request(view, request.method, request.path, response.status_code, duration, stats, size)
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:07
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_records(apps, schema_editor):
+    """Keep the earliest record per (student, date) so the unique constraint can be added."""
+    AttendanceRecord = apps.get_model("attendance", "AttendanceRecord")
+
+    duplicates = (
+        AttendanceRecord.objects
+        .filter(student__isnull=False)
+        .values("student", "date")
+        .annotate(n=Count("id"), keep=Min("id"))
+        .filter(n__gt=1)
+    )
+    for dup in duplicates:
+        AttendanceRecord.objects.filter(
+            student=dup["student"], date=dup["date"]
+        ).exclude(id=dup["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_add_initial_locations'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['date', 'check_in'], name='attendance_date_checkin_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_records, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='attendancerecord',
+            constraint=models.UniqueConstraint(fields=('student', 'date'), name='unique_attendance_per_student_day'),
+        ),
+    ]
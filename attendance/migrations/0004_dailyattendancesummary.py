@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_summary(apps, schema_editor):
+    AttendanceRecord = apps.get_model("attendance", "AttendanceRecord")
+    DailyAttendanceSummary = apps.get_model("attendance", "DailyAttendanceSummary")
+
+    groups = (
+        AttendanceRecord.objects
+        .annotate(dept=Coalesce("student__department", Value("")))
+        .values("date", "location", "dept")
+        .annotate(
+            present=Count("id", filter=Q(status="Present")),
+            absent=Count("id", filter=Q(status="Absent")),
+            checked_out=Count("id", filter=Q(check_out__isnull=False)),
+        )
+        .order_by()
+    )
+    DailyAttendanceSummary.objects.bulk_create(
+        [
+            DailyAttendanceSummary(
+                date=g["date"], location_id=g["location"], department=g["dept"],
+                present=g["present"], absent=g["absent"], checked_out=g["checked_out"],
+            )
+            for g in groups
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_attendancerecord_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('department', models.CharField(blank=True, default='', max_length=100)),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('checked_out', models.PositiveIntegerField(default=0)),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='attendance.location')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'location', 'department'), name='unique_daily_summary')],
+            },
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
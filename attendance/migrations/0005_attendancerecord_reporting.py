@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_dailyattendancesummary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendancerecord',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.localdate, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['student', 'date', 'status'], name='attendance_student_status_idx'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations
+
+# Frozen copy of the search schema; attendance/search.py queries it.
+SEARCH_TABLE = "attendance_student_search"
+
+SQLITE_SEARCH_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(matric_no, name, tokenize='trigram')",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, matric_no, name)
+        SELECT s.id, s.matric_no, TRIM(u.first_name || ' ' || u.last_name)
+        FROM attendance_student s JOIN auth_user u ON u.id = s.user_id""",
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_student_search_ai AFTER INSERT ON attendance_student BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, matric_no, name)
+        SELECT NEW.id, NEW.matric_no, TRIM(u.first_name || ' ' || u.last_name) FROM auth_user u WHERE u.id = NEW.user_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_student_search_au AFTER UPDATE OF matric_no, user_id ON attendance_student BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+        INSERT INTO {SEARCH_TABLE} (rowid, matric_no, name)
+        SELECT NEW.id, NEW.matric_no, TRIM(u.first_name || ' ' || u.last_name) FROM auth_user u WHERE u.id = NEW.user_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_student_search_ad AFTER DELETE ON attendance_student BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_student_search_user_au AFTER UPDATE OF first_name, last_name ON auth_user BEGIN
+        UPDATE {SEARCH_TABLE} SET name = TRIM(NEW.first_name || ' ' || NEW.last_name)
+        WHERE rowid IN (SELECT id FROM attendance_student WHERE user_id = NEW.id);
+    END""",
+]
+SQLITE_SEARCH_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS attendance_student_search_user_au",
+    "DROP TRIGGER IF EXISTS attendance_student_search_ad",
+    "DROP TRIGGER IF EXISTS attendance_student_search_au",
+    "DROP TRIGGER IF EXISTS attendance_student_search_ai",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+POSTGRES_SEARCH_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS attendance_student_matric_trgm "
+    "ON attendance_student USING gin (UPPER(matric_no) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS attendance_user_first_name_trgm "
+    "ON auth_user USING gin (UPPER(first_name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS attendance_user_last_name_trgm "
+    "ON auth_user USING gin (UPPER(last_name) gin_trgm_ops)",
+]
+POSTGRES_SEARCH_DROP_SQL = [
+    "DROP INDEX IF EXISTS attendance_user_last_name_trgm",
+    "DROP INDEX IF EXISTS attendance_user_first_name_trgm",
+    "DROP INDEX IF EXISTS attendance_student_matric_trgm",
+]
+
+
+def create_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor == "sqlite" and conn.Database.sqlite_version_info >= (3, 34, 0):
+        statements = SQLITE_SEARCH_SQL
+    elif conn.vendor == "postgresql":
+        statements = POSTGRES_SEARCH_SQL
+    else:
+        return  # other backends fall back to plain icontains lookups
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    statements = {"sqlite": SQLITE_SEARCH_DROP_SQL, "postgresql": POSTGRES_SEARCH_DROP_SQL}.get(conn.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_attendancerecord_reporting'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
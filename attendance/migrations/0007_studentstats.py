@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:41
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_stats(apps, schema_editor):
+    AttendanceRecord = apps.get_model("attendance", "AttendanceRecord")
+    Student = apps.get_model("attendance", "Student")
+    StudentStats = apps.get_model("attendance", "StudentStats")
+
+    def as_datetime(date, time):
+        return datetime.datetime.combine(date, time, tzinfo=datetime.timezone.utc) if time else None
+
+    stats = {pk: StudentStats(student_id=pk) for pk in Student.objects.values_list("pk", flat=True)}
+    records = (
+        AttendanceRecord.objects.filter(student__isnull=False)
+        .order_by("student_id", "date")
+        .values_list("student_id", "date", "status", "check_in", "check_out")
+        .iterator(chunk_size=2000)
+    )
+    for student_id, date, status, check_in, check_out in records:
+        row = stats[student_id]
+        row.total_sessions += 1
+        row.previous_streak = row.current_streak
+        if status == "Present":
+            row.days_present += 1
+            row.current_streak += 1
+        else:
+            row.current_streak = 0
+        row.last_session_date = date
+        row.last_check_in = as_datetime(date, check_in) or row.last_check_in
+        row.last_check_out = as_datetime(date, check_out) or row.last_check_out
+
+    StudentStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_student_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStats',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='attendance.student')),
+                ('total_sessions', models.PositiveIntegerField(default=0)),
+                ('days_present', models.PositiveIntegerField(default=0)),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('previous_streak', models.PositiveIntegerField(default=0)),
+                ('last_session_date', models.DateField(blank=True, null=True)),
+                ('last_check_in', models.DateTimeField(blank=True, null=True)),
+                ('last_check_out', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:49
+
+import datetime
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Frozen copy of the partition layout; attendance/partitions.py maintains it.
+TABLE = "attendance_attendancerecord"
+MONTHS_AHEAD = 3
+
+# Everything Django created for the plain table, recreated on the parent (cascading to partitions).
+# Unique constraints must include the partition key, so the partitioned primary key is (id, date).
+POSTGRES_TABLE_SQL = [
+    f"CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id",
+    f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq')",
+    f"SELECT setval('{TABLE}_id_seq', COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)",
+    f"ALTER TABLE {TABLE} ADD CONSTRAINT unique_attendance_per_student_day UNIQUE (student_id, date)",
+    f"CREATE INDEX attendance_date_checkin_idx ON {TABLE} (date, check_in)",
+    f"CREATE INDEX attendance_student_status_idx ON {TABLE} (student_id, date, status)",
+    f"CREATE INDEX {TABLE}_location_id_idx ON {TABLE} (location_id)",
+    f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_student_id_fk FOREIGN KEY (student_id) "
+    f"REFERENCES attendance_student (id) DEFERRABLE INITIALLY DEFERRED",
+    f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_location_id_fk FOREIGN KEY (location_id) "
+    f"REFERENCES attendance_location (id) DEFERRABLE INITIALLY DEFERRED",
+]
+
+
+def _months(first, last):
+    month = first.replace(day=1)
+    while month <= last:
+        following = (month + datetime.timedelta(days=32)).replace(day=1)
+        yield month, following
+        month = following
+
+
+def _rebuild(schema_editor, partitioned):
+    """Copy the records into a fresh (partitioned or plain) table and swap it in."""
+    execute = schema_editor.execute
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(date) FROM {TABLE}")
+        first = cursor.fetchone()[0]
+
+    clause = " PARTITION BY RANGE (date)" if partitioned else ""
+    execute(f"CREATE TABLE {TABLE}_new (LIKE {TABLE}){clause}")
+    if partitioned:
+        today = datetime.date.today()
+        last = (today.replace(day=1) + datetime.timedelta(days=31 * MONTHS_AHEAD)).replace(day=1)
+        for start, end in _months(min(first or today, today), last):
+            execute(f"CREATE TABLE {TABLE}_p{start:%Y%m} PARTITION OF {TABLE}_new "
+                    f"FOR VALUES FROM ('{start}') TO ('{end}')")
+        execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE}_new DEFAULT")
+
+    execute(f"INSERT INTO {TABLE}_new SELECT * FROM {TABLE}")
+    execute(f"DROP TABLE {TABLE}")
+    execute(f"ALTER TABLE {TABLE}_new RENAME TO {TABLE}")
+    execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY ({'id, date' if partitioned else 'id'})")
+    for sql in POSTGRES_TABLE_SQL:
+        execute(sql)
+
+
+def partition_records(apps, schema_editor):
+    # SQLite has no declarative partitioning; it archives closed semesters instead (archive_records)
+    if schema_editor.connection.vendor == "postgresql":
+        _rebuild(schema_editor, partitioned=True)
+
+
+def unpartition_records(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        _rebuild(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0007_studentstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(default=django.utils.timezone.localdate, editable=False)),
+                ('status', models.CharField(choices=[('Present', 'Present'), ('Absent', 'Absent')], max_length=10)),
+                ('check_in', models.TimeField(blank=True, null=True)),
+                ('check_out', models.TimeField(blank=True, null=True)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+            ],
+            options={
+                'db_table': 'attendance_record_history',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(partition_records, unpartition_records),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    # The DatabaseCache tables in CACHES ('shared' when there is no REDIS_URL), so
+    # `migrate` is all a deployment runs; existing tables are left alone
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0009_webauthncredential"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def merge_duplicates(apps, schema_editor):
+    """Fold the duplicate no-location rows concurrent bumps created into one row each."""
+    DailyAttendanceSummary = apps.get_model("attendance", "DailyAttendanceSummary")
+    duplicated = (
+        DailyAttendanceSummary.objects.filter(location__isnull=True)
+        .values("date", "department").annotate(rows=Count("id")).filter(rows__gt=1).order_by()
+    )
+    for group in duplicated:
+        first, *rest = DailyAttendanceSummary.objects.filter(
+            location__isnull=True, date=group["date"], department=group["department"],
+        ).order_by("pk")
+        DailyAttendanceSummary.objects.filter(pk=first.pk).update(
+            present=F("present") + sum(row.present for row in rest),
+            absent=F("absent") + sum(row.absent for row in rest),
+            checked_out=F("checked_out") + sum(row.checked_out for row in rest),
+        )
+        DailyAttendanceSummary.objects.filter(pk__in=[row.pk for row in rest]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0010_shared_cache_table'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='dailyattendancesummary',
+            name='unique_daily_summary',
+        ),
+        migrations.AddConstraint(
+            model_name='dailyattendancesummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('location__isnull', False)), fields=('date', 'location', 'department'), name='unique_daily_summary'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyattendancesummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('location__isnull', True)), fields=('date', 'department'), name='unique_daily_summary_no_location'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:05
+
+import importlib
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# Frozen copy of the search schema; attendance/search.py queries it. Names now come
+# from the student's own first_name/last_name (full_name), not from auth_user.
+previous = importlib.import_module("attendance.migrations.0006_student_search_index")
+SEARCH_TABLE = previous.SEARCH_TABLE
+
+SQLITE_SEARCH_SQL = [
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"INSERT INTO {SEARCH_TABLE} (rowid, matric_no, name) SELECT id, matric_no, full_name FROM attendance_student",
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_student_search_ai AFTER INSERT ON attendance_student BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, matric_no, name) VALUES (NEW.id, NEW.matric_no, NEW.full_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_student_search_au
+        AFTER UPDATE OF matric_no, first_name, last_name ON attendance_student BEGIN
+        UPDATE {SEARCH_TABLE} SET matric_no = NEW.matric_no, name = NEW.full_name WHERE rowid = NEW.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_student_search_ad AFTER DELETE ON attendance_student BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+    END""",
+]
+SQLITE_SEARCH_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS attendance_student_search_ad",
+    "DROP TRIGGER IF EXISTS attendance_student_search_au",
+    "DROP TRIGGER IF EXISTS attendance_student_search_ai",
+]
+
+POSTGRES_SEARCH_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS attendance_student_full_name_trgm "
+    "ON attendance_student USING gin (UPPER(full_name) gin_trgm_ops)",
+    "DROP INDEX IF EXISTS attendance_user_last_name_trgm",
+    "DROP INDEX IF EXISTS attendance_user_first_name_trgm",
+]
+POSTGRES_SEARCH_DROP_SQL = [
+    "DROP INDEX IF EXISTS attendance_student_full_name_trgm",
+    *[sql for sql in previous.POSTGRES_SEARCH_SQL if "ON auth_user" in sql],
+]
+
+
+def _has_sqlite_search(schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor != "sqlite":
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SEARCH_TABLE])
+        return cursor.fetchone() is not None
+
+
+def drop_user_search(apps, schema_editor):
+    # Adding full_name rebuilds attendance_student on SQLite, which fails while a
+    # trigger on auth_user names the table; the new triggers are created afterwards
+    if _has_sqlite_search(schema_editor):
+        for sql in previous.SQLITE_SEARCH_DROP_SQL:
+            if sql.startswith("DROP TRIGGER"):
+                schema_editor.execute(sql)
+
+
+def restore_user_search(apps, schema_editor):
+    if _has_sqlite_search(schema_editor):
+        schema_editor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        for sql in previous.SQLITE_SEARCH_SQL:
+            schema_editor.execute(sql)
+
+
+def create_student_search(apps, schema_editor):
+    if _has_sqlite_search(schema_editor):
+        for sql in SQLITE_SEARCH_SQL:
+            schema_editor.execute(sql)
+    elif schema_editor.connection.vendor == "postgresql":
+        for sql in POSTGRES_SEARCH_SQL:
+            schema_editor.execute(sql)
+
+
+def drop_student_search(apps, schema_editor):
+    if _has_sqlite_search(schema_editor):
+        for sql in SQLITE_SEARCH_DROP_SQL:
+            schema_editor.execute(sql)
+    elif schema_editor.connection.vendor == "postgresql":
+        for sql in POSTGRES_SEARCH_DROP_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0011_dailyattendancesummary_null_location'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_user_search, restore_user_search),
+        migrations.AddField(
+            model_name='student',
+            name='full_name',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Concat('first_name', models.Value(' '), 'last_name'), output_field=models.CharField(max_length=61)),
+        ),
+        migrations.RunPython(create_student_search, drop_student_search),
+    ]
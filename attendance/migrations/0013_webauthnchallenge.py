@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0012_student_full_name_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebAuthnChallenge',
+            fields=[
+                ('key', models.CharField(max_length=200, primary_key=True, serialize=False)),
+                ('challenge', models.CharField(max_length=200)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
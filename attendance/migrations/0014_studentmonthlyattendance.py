@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_months(apps, schema_editor):
+    # Live records only; `manage.py rebuild_student_stats` adds archived months
+    AttendanceRecord = apps.get_model("attendance", "AttendanceRecord")
+    StudentMonthlyAttendance = apps.get_model("attendance", "StudentMonthlyAttendance")
+
+    months = {}
+    present = (
+        AttendanceRecord.objects.filter(status="Present", student__isnull=False)
+        .values_list("student_id", "date")
+        .iterator(chunk_size=2000)
+    )
+    for student_id, date in present:
+        key = (student_id, date.replace(day=1))
+        months[key] = months.get(key, 0) | 1 << (date.day - 1)
+    StudentMonthlyAttendance.objects.bulk_create([
+        StudentMonthlyAttendance(student_id=student_id, month=month, present_days=days, days_present=days.bit_count())
+        for (student_id, month), days in months.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0013_webauthnchallenge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentMonthlyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('days_present', models.PositiveIntegerField(default=0)),
+                ('present_days', models.PositiveIntegerField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_attendance', to='attendance.student')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student', 'month'), name='unique_student_month')],
+            },
+        ),
+        migrations.RunPython(populate_months, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,10 @@
+import hashlib
+from functools import cached_property
+
 from django.db import models
+from django.db.models.functions import Concat
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Location(models.Model):
@@ -16,42 +21,91 @@ class Student(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     first_name = models.CharField(max_length=30, default="Unknown")
     last_name = models.CharField(max_length=30, default="Unknown")
+    # What name search matches (as one phrase), so every search path sees the same text
+    full_name = models.GeneratedField(
+        expression=Concat("first_name", models.Value(" "), "last_name"),
+        output_field=models.CharField(max_length=61),
+        db_persist=True,
+    )
     matric_no = models.CharField(max_length=20, unique=True)
     department = models.CharField(max_length=100)
 
-    # 🔹 WebAuthn credential fields for biometric auth
-    webauthn_credential_id = models.BinaryField(null=True, blank=True, editable=False)
-    webauthn_public_key = models.BinaryField(null=True, blank=True, editable=False)
-    webauthn_sign_count = models.PositiveIntegerField(default=0, editable=False)
-
-    # helper field to check if registered
-    @property
+    # helper field to check if registered; querysets may fill it with an Exists() annotation of the same name
+    @cached_property
     def fingerprint_registered(self):
-        return self.webauthn_credential_id is not None and self.webauthn_public_key is not None
+        return self.credentials.exists()
 
     def __str__(self):
         return f"{self.matric_no} - {self.first_name} {self.last_name}"
 
 
+def credential_id_hash(credential_id):
+    """Fixed-width index key for a WebAuthn credential ID (authenticators may return up to 1023 bytes)."""
+    return hashlib.sha256(bytes(credential_id)).hexdigest()
+
+
+class WebAuthnCredential(models.Model):
+    """One registered authenticator (phone, laptop, security key); a student may have several."""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="credentials")
+    credential_id = models.BinaryField(editable=False)
+    # Every assertion is matched on this unique B-tree index, so finding the
+    # owner of a presented credential (usernameless login) is one index lookup
+    credential_id_hash = models.CharField(max_length=64, unique=True, editable=False)
+    public_key = models.BinaryField(editable=False)
+    sign_count = models.PositiveBigIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        # bulk_create skips save(): pass credential_id_hash=credential_id_hash(...) there
+        self.credential_id_hash = credential_id_hash(self.credential_id)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.student.matric_no} - {self.credential_id_hash[:12]}"
+
+
+class WebAuthnChallenge(models.Model):
+    """
+    An outstanding WebAuthn challenge when there is no cache server (see
+    attendance/challenges.py). Its own table, so nothing else's churn can evict
+    one; expired rows are swept by expires_at.
+    """
+    key = models.CharField(max_length=200, primary_key=True)
+    challenge = models.CharField(max_length=200)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.key
+
 
-class AttendanceRecord(models.Model):
+class AttendanceFields(models.Model):
     STATUS_CHOICES = (
         ('Present', 'Present'),
         ('Absent', 'Absent'),
     )
 
+    date = models.DateField(default=timezone.localdate, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    check_in = models.TimeField(null=True, blank=True)
+    check_out = models.TimeField(null=True, blank=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        student_name = self.student.matric_no if self.student else "Unknown"
+        return f"{student_name} - {self.date} - {self.status}"
+
+
+class AttendanceRecord(AttendanceFields):
     student = models.ForeignKey(
         Student,
         on_delete=models.CASCADE,
         null=True,      # allow null for smoother migrations
         blank=True
     )
-    date = models.DateField(auto_now_add=True)
-    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
-    check_in = models.TimeField(null=True, blank=True)
-    check_out = models.TimeField(null=True, blank=True)
-    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
-    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     location = models.ForeignKey(
         "Location",  # string reference avoids circular import
         on_delete=models.SET_NULL,
@@ -59,6 +113,99 @@ class AttendanceRecord(models.Model):
         blank=True
     )
 
+    class Meta:
+        indexes = [
+            # date__range filters + ORDER BY -date, -check_in (admin lists, CSV export)
+            models.Index(fields=["date", "check_in"], name="attendance_date_checkin_idx"),
+            # Covering index for per-student range reports (no table lookups for status)
+            models.Index(fields=["student", "date", "status"], name="attendance_student_status_idx"),
+        ]
+        constraints = [
+            # One record per student per day; also serves the (student, date) lookups
+            models.UniqueConstraint(fields=["student", "date"], name="unique_attendance_per_student_day"),
+        ]
+
+
+class AttendanceHistory(AttendanceFields):
+    """
+    Read-only view over live and archived records (SQLite archive database, see
+    attendance/archive.py). Use archive.record_queryset() rather than querying it
+    directly: the view only exists on connections that have the archive attached.
+    """
+    student = models.ForeignKey(Student, on_delete=models.DO_NOTHING, null=True, blank=True,
+                                related_name="+", db_constraint=False)
+    location = models.ForeignKey("Location", on_delete=models.DO_NOTHING, null=True, blank=True,
+                                 related_name="+", db_constraint=False)
+
+    class Meta:
+        managed = False
+        db_table = "attendance_record_history"
+
+
+class DailyAttendanceSummary(models.Model):
+    """Pre-aggregated attendance counts per day, location and department."""
+    date = models.DateField()
+    location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True)
+    department = models.CharField(max_length=100, blank=True, default="")
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    checked_out = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # NULLs are distinct in a unique constraint, so rows without a location get their own
+        constraints = [
+            models.UniqueConstraint(fields=["date", "location", "department"], name="unique_daily_summary",
+                                    condition=models.Q(location__isnull=False)),
+            models.UniqueConstraint(fields=["date", "department"], name="unique_daily_summary_no_location",
+                                    condition=models.Q(location__isnull=True)),
+        ]
+
     def __str__(self):
-        student_name = self.student.matric_no if self.student else "Unknown"
-        return f"{student_name} - {self.date} - {self.status}"
+        location_name = self.location.name if self.location else "No location"
+        return f"{self.date} - {location_name} - {self.department}: {self.present} present, {self.absent} absent"
+
+
+class StudentStats(models.Model):
+    """
+    Denormalized per-student attendance counters, kept up to date by check-in,
+    check-out and close_day so the dashboard never scans a student's history.
+    `manage.py rebuild_student_stats` recomputes them from the raw records.
+    """
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    total_sessions = models.PositiveIntegerField(default=0)
+    days_present = models.PositiveIntegerField(default=0)
+    # Consecutive Present sessions ending at the latest session, and the value it had
+    # before that session was counted (so a late check-in over an Absent can restore it)
+    current_streak = models.PositiveIntegerField(default=0)
+    previous_streak = models.PositiveIntegerField(default=0)
+    last_session_date = models.DateField(null=True, blank=True)
+    last_check_in = models.DateTimeField(null=True, blank=True)
+    last_check_out = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def attendance_rate(self):
+        return round(self.days_present * 100 / self.total_sessions, 1) if self.total_sessions else 0.0
+
+    def __str__(self):
+        return f"{self.student_id}: {self.days_present}/{self.total_sessions} present, streak {self.current_streak}"
+
+
+class StudentMonthlyAttendance(models.Model):
+    """
+    Per-student, per-month rollup of days present, which the attendance report
+    ranks students by. Kept up to date alongside StudentStats (attendance/stats.py);
+    bit d-1 of present_days is set for each day d the student was present, so a
+    range starting or ending mid-month is counted from the rollup too.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="monthly_attendance")
+    month = models.DateField()  # first day of the month
+    days_present = models.PositiveIntegerField(default=0)
+    present_days = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["student", "month"], name="unique_student_month"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} {self.month:%Y-%m}: {self.days_present} present"
@@ -0,0 +1,101 @@
+import hashlib
+import uuid
+from functools import cached_property
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+# Admin pages (dashboard, student list, records) are cached in PAGE_CACHE_ALIAS
+# under keys that carry a "last modified" stamp for each model they show. Writing
+# a model bumps its stamp, so the next request misses and re-renders; entries
+# under old stamps are never looked up again and just expire. Checking the stamps
+# is one cache get_many() per request.
+#
+# The stamps live in PAGE_STAMP_CACHE_ALIAS, which every worker must share (Redis,
+# or the database cache table without it). The pages themselves can stay in
+# per-process memory: a worker holding a stale page only ever has it under an old stamp.
+#
+# post_save/post_delete receivers (signals.py) bump stamps for single-object
+# writes. bulk_create, queryset update()/delete() and raw SQL send no signals, so
+# code writing that way calls touch() itself.
+STUDENT = "student"
+LOCATION = "location"
+RECORD = "record"
+STAMP_KEY = "attendance:stamp:{}"
+KEY_PREFIX = "attendance:page"
+
+
+def page_cache_alias():
+    return getattr(settings, "PAGE_CACHE_ALIAS", "default")
+
+
+def page_cache():
+    return caches[page_cache_alias()]
+
+
+def stamp_cache():
+    return caches[getattr(settings, "PAGE_STAMP_CACHE_ALIAS", page_cache_alias())]
+
+
+def page_cache_timeout():
+    return getattr(settings, "PAGE_CACHE_TIMEOUT", 300)
+
+
+def touch(*names):
+    """Mark these models as modified now, and again once the current transaction commits."""
+    def bump():
+        stamp_cache().set_many({STAMP_KEY.format(name): uuid.uuid4().hex for name in names}, timeout=None)
+
+    bump()
+    # A page rendered between the write and its commit would cache the old rows under the new stamp
+    transaction.on_commit(bump)
+
+
+def stamp(*names):
+    """The current stamps of `names` joined into one string, for cache keys."""
+    cache = stamp_cache()
+    keys = [STAMP_KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # First request since start-up (or the stamp was evicted): publish one everyone agrees on
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            found[key] = cache.get(key)
+    return ".".join(found[key] for key in keys)
+
+
+def page_key(name, *parts):
+    digest = hashlib.md5(":".join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+    return f"{KEY_PREFIX}:{name}:{digest}"
+
+
+def cached(name, parts, build):
+    """build()'s result, computed once per distinct `parts` (which should include a stamp)."""
+    cache, key = page_cache(), page_key(name, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, page_cache_timeout())
+    return value
+
+
+class PageCacheMixin:
+    """
+    Puts page_stamp (the stamps of `page_cache_models`) and the cache settings in
+    the context, for templates to pass to {% cache %}:
+
+        {% cache page_cache_timeout "fragment" page_stamp using=page_cache_alias %}
+    """
+    page_cache_models = ()
+
+    @cached_property
+    def page_stamp(self):
+        return stamp(*self.page_cache_models)
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["page_stamp"] = self.page_stamp
+        ctx["page_cache_alias"] = page_cache_alias()
+        ctx["page_cache_timeout"] = page_cache_timeout()
+        return ctx
@@ -0,0 +1,145 @@
+import base64
+import json
+
+from django.db.models import F, Q
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset (no OFFSET, no COUNT unless asked)."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+        self.next_querystring = self.previous_querystring = ""
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by seeking on its sort keys instead of OFFSET, so
+    page 10,000 costs the same as page 1.
+
+    `keys` are model field names, newest-first (DESC, NULLs last); the last
+    one must be unique (e.g. "id") so every row has a distinct position.
+    Cursors are opaque base64 tokens holding the boundary row's key values.
+    """
+
+    def __init__(self, queryset, per_page, keys=("date", "check_in", "id")):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = keys
+        self.fields = [queryset.model._meta.get_field(key) for key in keys]
+
+    # ---------------- cursors ----------------
+    def encode_cursor(self, obj, direction):
+        values = [field.value_to_string(obj) if getattr(obj, field.attname) is not None else None
+                  for field in self.fields]
+        raw = json.dumps({"d": direction, "v": values}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    def decode_cursor(self, cursor):
+        """Return (direction, values) or None for a missing/garbled cursor."""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            data = json.loads(raw)
+            values = [None if v is None else field.to_python(v) for field, v in zip(self.fields, data["v"])]
+            if data["d"] not in ("next", "prev") or len(values) != len(self.fields):
+                return None
+            return data["d"], values
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    # ---------------- seek predicates ----------------
+    def _seek(self, values, forward):
+        """
+        Rows strictly after (forward) or before the cursor position in
+        DESC NULLS LAST order, as a Q:  k1 past v1
+                                     OR (k1 = v1 AND k2 past v2)
+                                     OR ...
+        """
+        condition, equal = Q(pk__in=[]), Q()
+        for key, value in zip(self.keys, values):
+            if forward:
+                past = Q(**{f"{key}__isnull": True}) | Q(**{f"{key}__lt": value}) if value is not None else None
+            else:
+                past = Q(**{f"{key}__gt": value}) if value is not None else Q(**{f"{key}__isnull": False})
+            if past is not None:
+                condition |= equal & past
+            equal &= Q(**{f"{key}__isnull": True}) if value is None else Q(**{key: value})
+        return condition
+
+    def _ordering(self, forward):
+        if forward:
+            return [F(key).desc(nulls_last=True) for key in self.keys]
+        return [F(key).asc(nulls_first=True) for key in self.keys]
+
+    def page(self, cursor=None, with_count=False):
+        decoded = self.decode_cursor(cursor)
+        forward = decoded is None or decoded[0] == "next"
+
+        qs = self.queryset.order_by(*self._ordering(forward))
+        if decoded is not None:
+            values = decoded[1]
+            # Redundant bound on the leading key keeps the seek index-friendly
+            bound = f"{self.keys[0]}__lte" if forward else f"{self.keys[0]}__gte"
+            qs = qs.filter(self._seek(values, forward), **{bound: values[0]})
+
+        rows = list(qs[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if more or not forward:
+                next_cursor = self.encode_cursor(rows[-1], "next")
+            if (more and not forward) or (forward and decoded is not None):
+                previous_cursor = self.encode_cursor(rows[0], "prev")
+
+        count = self.queryset.count() if with_count else None
+        return KeysetPage(rows, next_cursor, previous_cursor, count)
+
+
+class KeysetPaginationMixin:
+    """
+    Drop-in replacement for ListView's OFFSET pagination. Reads ?cursor=...,
+    and only runs COUNT(*) when the request asks for it with ?count=1.
+    """
+    keyset = ("date", "check_in", "id")
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.keyset)
+        page = paginator.page(
+            self.request.GET.get("cursor"),
+            with_count=self.request.GET.get("count") == "1",
+        )
+
+        params = self.request.GET.copy()
+        params.pop("cursor", None)
+        if page.has_next():
+            params["cursor"] = page.next_cursor
+            page.next_querystring = params.urlencode()
+        if page.has_previous():
+            params["cursor"] = page.previous_cursor
+            page.previous_querystring = params.urlencode()
+
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,90 @@
+import datetime
+
+from django.db import connection, transaction
+
+from .models import AttendanceRecord
+
+# On PostgreSQL, attendance_attendancerecord is range-partitioned by month on `date`
+# (migration 0008), so date__range filters only touch the matching partitions.
+# Months nobody created a partition for land in the DEFAULT partition;
+# ensure_partitions() (cron: `manage.py ensure_partitions`) keeps ahead of the calendar.
+MONTHS_AHEAD = 3
+
+
+def month_start(date):
+    return date.replace(day=1)
+
+
+def next_month(date):
+    return (month_start(date) + datetime.timedelta(days=32)).replace(day=1)
+
+
+def partition_name(month):
+    return f"{AttendanceRecord._meta.db_table}_p{month:%Y%m}"
+
+
+def default_partition_name():
+    return f"{AttendanceRecord._meta.db_table}_default"
+
+
+def is_partitioned(conn=connection):
+    if conn.vendor != "postgresql":
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [AttendanceRecord._meta.db_table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(conn=connection):
+    """Names of the record table's partitions (including the DEFAULT one)."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND pg_table_is_visible(p.oid) ORDER BY c.relname",
+            [AttendanceRecord._meta.db_table],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
+def create_month_partition(month, conn=connection):
+    """
+    Add the partition for `month`. Rows already sitting in the DEFAULT partition
+    for that month are moved into it first, otherwise ATTACH PARTITION refuses.
+    """
+    qn = conn.ops.quote_name
+    table, name, default = AttendanceRecord._meta.db_table, partition_name(month), default_partition_name()
+    bounds = [month_start(month), next_month(month)]
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(default)} WHERE date >= %s AND date < %s RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved",
+            bounds,
+        )
+        # Partition bounds can't be bind parameters (DDL); they're date objects, so safe to inline
+        cursor.execute(f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} "
+                       f"FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')")
+    return name
+
+
+def ensure_partitions(months_ahead=MONTHS_AHEAD, start=None, conn=connection):
+    """Create any missing monthly partitions from `start` (default: this month) to months_ahead on. Returns their names."""
+    if not is_partitioned(conn):
+        return []
+    existing = set(list_partitions(conn))
+    month = month_start(start or datetime.date.today())
+    last = month_start(datetime.date.today())
+    for _ in range(months_ahead):
+        last = next_month(last)
+
+    created = []
+    while month <= last:
+        if partition_name(month) not in existing:
+            created.append(create_month_partition(month, conn))
+        month = next_month(month)
+    return created
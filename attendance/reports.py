@@ -0,0 +1,94 @@
+import calendar
+import operator
+from functools import reduce
+
+from django.db.models import (
+    Case, Count, ExpressionWrapper, F, FilteredRelation, FloatField, IntegerField, Q, Sum, Value, When, Window,
+)
+from django.db.models.functions import Cast, Coalesce, Lag, Rank
+
+from .models import DailyAttendanceSummary, Student
+
+
+def session_days(start, end):
+    """Number of distinct days in the range on which any attendance was recorded."""
+    return (
+        DailyAttendanceSummary.objects
+        .filter(date__range=[start, end])
+        .aggregate(days=Count("date", distinct=True))["days"]
+    )
+
+
+def _days_present_between(month, first_day, last_day):
+    """Days present in `month` from first_day to last_day, read from the rollup row's day bits."""
+    length = calendar.monthrange(month.year, month.month)[1]
+    inside = range(first_day, min(last_day, length) + 1)
+    outside = [day for day in range(1, length + 1) if day not in inside]
+    if not outside:
+        return F("months__days_present")
+
+    def count(days):
+        return reduce(operator.add, (F("months__present_days").bitrightshift(day - 1).bitand(1) for day in days))
+    # Whichever side has fewer days: at most 15 bit tests per partial month
+    present = F("months__days_present") - count(outside) if len(outside) < len(inside) else count(inside)
+    return ExpressionWrapper(present, output_field=IntegerField())
+
+
+def student_attendance(start, end, days):
+    """
+    Per-student days present, attendance percentage and rank over the range,
+    summed from the monthly rollup (StudentMonthlyAttendance): a few rows per
+    student instead of one per day, with the first and last month's days counted
+    from their day bits.
+    """
+    first, last = start.replace(day=1), end.replace(day=1)
+    if first == last:
+        present = _days_present_between(first, start.day, end.day)
+    else:
+        present = Case(
+            When(months__month=first, then=_days_present_between(first, start.day, 31)),
+            When(months__month=last, then=_days_present_between(last, 1, end.day)),
+            default=F("months__days_present"),
+            output_field=IntegerField(),
+        )
+    return (
+        Student.objects
+        .annotate(months=FilteredRelation(
+            "monthly_attendance", condition=Q(monthly_attendance__month__range=[first, last]),
+        ))
+        .annotate(days_present=Coalesce(Sum(present), 0))
+        .annotate(
+            percentage=Cast(F("days_present"), FloatField()) * 100.0 / Value(float(days or 1)),
+            rank=Window(Rank(), order_by=F("days_present").desc()),
+        )
+        .values("id", "matric_no", "first_name", "last_name", "department",
+                "days_present", "percentage", "rank")
+        .order_by("rank", "matric_no")
+    )
+
+
+def location_usage(start, end):
+    """Check-ins and check-outs per location over the range."""
+    return (
+        DailyAttendanceSummary.objects
+        .filter(date__range=[start, end], location__isnull=False)
+        .values("location__name")
+        .annotate(check_ins=Sum("present"), check_outs=Sum("checked_out"))
+        .order_by("-check_ins", "location__name")
+    )
+
+
+def daily_trend(start, end):
+    """Present/absent per day with the change in attendance from the previous day."""
+    day_present = Sum("present")
+    return (
+        DailyAttendanceSummary.objects
+        .filter(date__range=[start, end])
+        .values("date")
+        .annotate(
+            day_present=day_present,
+            day_absent=Sum("absent"),
+            change=day_present - Coalesce(Window(Lag(day_present), order_by=F("date").asc()), day_present),
+        )
+        .order_by("date")
+    )
@@ -0,0 +1,69 @@
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Student
+
+# SQLite: FTS5 shadow table (trigram tokenizer) holding every student's matric
+# number and full name, keyed by student id and kept in sync by triggers.
+SEARCH_TABLE = "attendance_student_search"
+MIN_TRIGRAM_QUERY = 3  # the trigram tokenizer cannot match shorter strings
+TYPEAHEAD_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+
+def fts_supported(conn=connection):
+    """FTS5's trigram tokenizer arrived in SQLite 3.34."""
+    return conn.vendor == "sqlite" and conn.Database.sqlite_version_info >= (3, 34, 0)
+
+
+def _fts_phrase(query):
+    # Quote as one FTS5 phrase so user input is never parsed as query syntax
+    return '"' + query.replace('"', '""') + '"'
+
+
+def _orm_filter(query):
+    """
+    The whole query must appear in the matric number or the full name, the same
+    phrase match FTS5 makes. On PostgreSQL each branch is served by a pg_trgm GIN
+    index on UPPER(column), which is exactly what icontains compiles to.
+    """
+    return Q(matric_no__icontains=query) | Q(full_name__icontains=query)
+
+
+def search_students(query, queryset=None):
+    """Students whose matric number or name contains `query` (prefix or infix)."""
+    queryset = Student.objects.all() if queryset is None else queryset
+    query = " ".join(query.split())
+    if not query:
+        return queryset.none()
+
+    if len(query) >= MIN_TRIGRAM_QUERY and fts_supported():
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", (_fts_phrase(query),)
+        ))
+    return queryset.filter(_orm_filter(query))
+
+
+def typeahead(query, limit=TYPEAHEAD_LIMIT):
+    """Top `limit` matches, matric-number prefix hits first, as JSON-ready dicts."""
+    query = " ".join(query.split())
+    students = (
+        search_students(query)
+        .annotate(prefix_rank=Case(
+            When(matric_no__istartswith=query, then=Value(0)),
+            default=Value(1), output_field=IntegerField(),
+        ))
+        .order_by("prefix_rank", "matric_no")
+        .values("id", "matric_no", "department", "full_name")[:limit]
+    )
+    return [
+        {
+            "id": s["id"],
+            "matric_no": s["matric_no"],
+            "name": s["full_name"].strip(),
+            "department": s["department"],
+        }
+        for s in students
+    ]
+
@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .archive import attach_archive_on_connect
+from .catalogue import invalidate_location_catalogue
+from .instrumentation import install_query_wrapper
+from .models import AttendanceRecord, Location, Student
+from .pagecache import LOCATION, RECORD, STUDENT, touch
+from .sqlite_tuning import apply_sqlite_pragmas
+from .summary import drop_student_summary, fold_location_summary, move_student_summary
+
+
+@receiver(pre_delete, sender=Location)
+def location_deleted(sender, instance, **kwargs):
+    # Its records keep their counts with no location; the summary rows follow them
+    fold_location_summary(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Location)
+def location_changed(sender, **kwargs):
+    # Geofences moved, resized, added or removed → reload the catalogue and its spatial index
+    invalidate_location_catalogue()
+    touch(LOCATION)
+
+
+# Bookkeeping saves don't change anything the cached admin pages show
+IGNORED_UPDATES = {"last_login"}
+
+
+def _shows(update_fields):
+    return not update_fields or not set(update_fields) <= IGNORED_UPDATES
+
+
+@receiver([post_save, post_delete], sender=Student)
+def student_changed(sender, update_fields=None, **kwargs):
+    if _shows(update_fields):
+        touch(STUDENT)
+
+
+# The daily summary counts each record under its student's department: keep it
+# in step when a student moves department or is deleted (their records cascade).
+# Bulk .update()/.delete() skip these; run rebuild_daily_summary after those.
+@receiver(pre_save, sender=Student)
+def remember_department(sender, instance, update_fields=None, **kwargs):
+    if instance.pk and (update_fields is None or "department" in update_fields):
+        instance._saved_department = (
+            Student.objects.filter(pk=instance.pk).values_list("department", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Student)
+def department_changed(sender, instance, created, **kwargs):
+    old = instance.__dict__.pop("_saved_department", None)
+    if not created and old is not None and old != instance.department:
+        move_student_summary(instance.pk, old, instance.department)
+
+
+@receiver(pre_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    drop_student_summary(instance.pk, instance.department)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    # Student names on the admin pages come from the User
+    if _shows(update_fields):
+        touch(STUDENT)
+
+
+# post_save only: a post_delete receiver would stop Django fast-deleting a
+# student's records on cascade. Deleting a student bumps STUDENT, and the pages
+# showing records are keyed on both stamps.
+@receiver(post_save, sender=AttendanceRecord)
+def record_changed(sender, **kwargs):
+    touch(RECORD)
+
+
+# Count and time SQL for the instrumentation middleware on every connection
+connection_created.connect(install_query_wrapper, dispatch_uid="attendance_query_wrapper")
+
+# SQLite: WAL, synchronous, busy_timeout, mmap and cache size (SQLITE_PRAGMAS)
+connection_created.connect(apply_sqlite_pragmas, dispatch_uid="attendance_sqlite_pragmas")
+
+# SQLite: attach the archive of closed semesters, if there is one (see archive.py)
+connection_created.connect(attach_archive_on_connect, dispatch_uid="attendance_attach_archive")
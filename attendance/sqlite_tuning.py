@@ -0,0 +1,26 @@
+import re
+
+from django.conf import settings
+
+PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+PRAGMA_VALUE = re.compile(r"^-?\w+$")
+
+
+def pragma_statements(pragmas):
+    """PRAGMA statements for a {name: value} dict (values can't be bound parameters, so they're checked)."""
+    statements = []
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"Invalid SQLite pragma {name}={value!r}")
+        statements.append(f"PRAGMA {name} = {value}")
+    return statements
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created receiver: apply SQLITE_PRAGMAS to each new SQLite connection."""
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", None)
+    if connection.vendor != "sqlite" or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for sql in pragma_statements(pragmas):
+            cursor.execute(sql)
@@ -0,0 +1,249 @@
+import datetime
+
+from django.db import transaction
+from django.db.models import Case, DateField, DateTimeField, F, PositiveIntegerField, Q, Value, When
+from django.db.models.lookups import Exact
+
+from .archive import record_queryset
+from .models import Student, StudentMonthlyAttendance, StudentStats
+from .utils import bulk_set
+
+# Incremental maintenance assumes sessions arrive in date order (check-ins happen
+# on the day, close_day runs after them). Anything out of order — back-filling
+# old dates, editing records in the admin — is fixed by rebuild_student_stats().
+
+
+def _is_newer(date):
+    return Q(last_session_date__isnull=True) | Q(last_session_date__lt=date)
+
+
+def _latest_check_in(at):
+    return Case(
+        When(Q(last_check_in__isnull=True) | Q(last_check_in__lt=at), then=Value(at)),
+        default=F("last_check_in"), output_field=DateTimeField(),
+    )
+
+
+def _new_session(date, present, at=None):
+    """UPDATE assignments for one more session on `date` (all read the pre-update row)."""
+    newer = _is_newer(date)
+    updates = {
+        "total_sessions": F("total_sessions") + 1,
+        "previous_streak": Case(When(newer, then=F("current_streak")), default=F("previous_streak"),
+                                output_field=PositiveIntegerField()),
+        "current_streak": Case(When(newer, then=F("current_streak") + 1 if present else Value(0)),
+                               default=F("current_streak"), output_field=PositiveIntegerField()),
+        "last_session_date": Case(When(newer, then=Value(date)), default=F("last_session_date"),
+                                  output_field=DateField()),
+    }
+    if present:
+        updates["days_present"] = F("days_present") + 1
+        if at is not None:
+            updates["last_check_in"] = _latest_check_in(at)
+    return updates
+
+
+def _late_check_in(date, at, was_absent):
+    """UPDATE assignments for an existing session on `date` turning into a check-in."""
+    updates = {"last_check_in": _latest_check_in(at)}
+    if was_absent:
+        updates["days_present"] = F("days_present") + 1
+        updates["current_streak"] = Case(
+            When(last_session_date=date, then=F("previous_streak") + 1),
+            default=F("current_streak"), output_field=PositiveIntegerField(),
+        )
+    return updates
+
+
+def ensure_student_stats(student_ids):
+    StudentStats.objects.bulk_create([StudentStats(student_id=pk) for pk in student_ids], ignore_conflicts=True)
+
+
+def _update(student_ids, updates):
+    stats = StudentStats.objects.filter(student_id__in=student_ids)
+    if stats.update(**updates) < len(student_ids):
+        # First session for some of them → create their rows, then apply to those only
+        with transaction.atomic():
+            existing = set(stats.values_list("student_id", flat=True))
+            missing = [pk for pk in student_ids if pk not in existing]
+            ensure_student_stats(missing)
+            StudentStats.objects.filter(student_id__in=missing).update(**updates)
+
+
+def _month(date):
+    return date.replace(day=1)
+
+
+def _present_on(date):
+    """UPDATE assignments marking `date` present in its month's rollup row (a no-op if it already is)."""
+    bit = 1 << (date.day - 1)
+    return {
+        "days_present": Case(When(Exact(F("present_days").bitand(bit), 0), then=F("days_present") + 1),
+                             default=F("days_present"), output_field=PositiveIntegerField()),
+        "present_days": F("present_days").bitor(bit),
+    }
+
+
+def record_present_days(student_ids, date):
+    """These students were present on `date`: set the day in their monthly rollup."""
+    months = StudentMonthlyAttendance.objects.filter(month=_month(date))
+    updates = _present_on(date)
+    if months.filter(student_id__in=student_ids).update(**updates) < len(student_ids):
+        with transaction.atomic():
+            existing = set(months.filter(student_id__in=student_ids).values_list("student_id", flat=True))
+            missing = [pk for pk in student_ids if pk not in existing]
+            StudentMonthlyAttendance.objects.bulk_create(
+                [StudentMonthlyAttendance(student_id=pk, month=_month(date)) for pk in missing], ignore_conflicts=True
+            )
+            months.filter(student_id__in=missing).update(**updates)
+
+
+def record_sessions(student_ids, date, present, at=None):
+    """New AttendanceRecords for these students on `date` (present ones checked in at `at`)."""
+    if student_ids:
+        _update(list(student_ids), _new_session(date, present, at))
+        if present:
+            record_present_days(list(student_ids), date)
+
+
+def record_check_ins(check_ins, date, batch_size=1000):
+    """
+    New present sessions on `date` for {student_id: checked-in datetime}: the
+    counters in one UPDATE, then each student's own last_check_in (if later).
+    """
+    if not check_ins:
+        return
+    record_sessions(list(check_ins), date, present=True)
+    rows = StudentStats.objects.filter(student_id__in=list(check_ins)).values_list("pk", "student_id", "last_check_in")
+    bulk_set(StudentStats, "last_check_in", {
+        pk: check_ins[student_id] for pk, student_id, last in rows
+        if last is None or last < check_ins[student_id]
+    }, batch_size)
+
+
+def record_session(student_id, date, present, at=None):
+    record_sessions([student_id], date, present, at)
+
+
+def record_late_check_in(student_id, date, at, was_absent):
+    """An existing record on `date` (e.g. marked Absent by close_day) was checked into."""
+    _update([student_id], _late_check_in(date, at, was_absent))
+    record_present_days([student_id], date)
+
+
+def record_check_out(student_id, at):
+    StudentStats.objects.filter(student_id=student_id).update(last_check_out=at)
+
+
+# ---------------- ASYNC (ASGI check-in views) ----------------
+async def _aupdate(student_id, updates):
+    if not await StudentStats.objects.filter(student_id=student_id).aupdate(**updates):
+        await StudentStats.objects.aget_or_create(student_id=student_id)
+        await StudentStats.objects.filter(student_id=student_id).aupdate(**updates)
+
+
+async def _arecord_present_day(student_id, date):
+    months = StudentMonthlyAttendance.objects.filter(student_id=student_id, month=_month(date))
+    if not await months.aupdate(**_present_on(date)):
+        await StudentMonthlyAttendance.objects.aget_or_create(student_id=student_id, month=_month(date))
+        await months.aupdate(**_present_on(date))
+
+
+async def arecord_session(student_id, date, present, at=None):
+    await _aupdate(student_id, _new_session(date, present, at))
+    if present:
+        await _arecord_present_day(student_id, date)
+
+
+async def arecord_late_check_in(student_id, date, at, was_absent):
+    await _aupdate(student_id, _late_check_in(date, at, was_absent))
+    await _arecord_present_day(student_id, date)
+
+
+async def arecord_check_out(student_id, at):
+    await StudentStats.objects.filter(student_id=student_id).aupdate(last_check_out=at)
+
+
+# ---------------- RECONCILIATION ----------------
+def _as_datetime(date, time):
+    # check_in/check_out hold the UTC wall-clock time of timezone.now()
+    return datetime.datetime.combine(date, time, tzinfo=datetime.timezone.utc) if time else None
+
+
+STAT_FIELDS = ["total_sessions", "days_present", "current_streak", "previous_streak",
+               "last_session_date", "last_check_in", "last_check_out"]
+
+
+def compute_student_stats(batch_size=2000):
+    """Every student's counters recomputed from all records, archived ones too, in one ordered pass (unsaved rows)."""
+    records = (
+        record_queryset().filter(student__isnull=False)
+        .order_by("student_id", "date")
+        .values_list("student_id", "date", "status", "check_in", "check_out")
+        .iterator(chunk_size=batch_size)
+    )
+
+    stats = {pk: StudentStats(student_id=pk) for pk in Student.objects.values_list("pk", flat=True)}
+    for student_id, date, status, check_in, check_out in records:
+        row = stats.get(student_id)
+        if row is None:
+            continue
+        row.total_sessions += 1
+        row.previous_streak = row.current_streak
+        if status == "Present":
+            row.days_present += 1
+            row.current_streak += 1
+        else:
+            row.current_streak = 0
+        row.last_session_date = date
+        row.last_check_in = _as_datetime(date, check_in) or row.last_check_in
+        row.last_check_out = _as_datetime(date, check_out) or row.last_check_out
+    return stats
+
+
+def find_stale_student_stats(batch_size=2000):
+    """Student ids whose stored counters differ from (or are missing against) the raw records."""
+    expected = compute_student_stats(batch_size)
+    stored = {row.student_id: row for row in StudentStats.objects.iterator(chunk_size=batch_size)}
+    return sorted(
+        pk for pk, row in expected.items()
+        if pk not in stored or any(getattr(row, f) != getattr(stored[pk], f) for f in STAT_FIELDS)
+    )
+
+
+def compute_monthly_attendance(batch_size=2000):
+    """Every student's monthly rollup recomputed from all present records, archived ones too (unsaved rows)."""
+    students = set(Student.objects.values_list("pk", flat=True))
+    present = (
+        record_queryset().filter(status="Present", student__isnull=False)
+        .values_list("student_id", "date")
+        .iterator(chunk_size=batch_size)
+    )
+    months = {}
+    for student_id, date in present:
+        if student_id in students:
+            key = (student_id, _month(date))
+            months[key] = months.get(key, 0) | 1 << (date.day - 1)
+    return [
+        StudentMonthlyAttendance(student_id=student_id, month=month, present_days=days, days_present=days.bit_count())
+        for (student_id, month), days in months.items()
+    ]
+
+
+def rebuild_monthly_attendance(batch_size=2000):
+    """Replace every StudentMonthlyAttendance row with one recomputed from the raw records."""
+    rows = compute_monthly_attendance(batch_size)
+    with transaction.atomic():
+        StudentMonthlyAttendance.objects.all().delete()
+        StudentMonthlyAttendance.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def rebuild_student_stats(batch_size=2000):
+    """Replace every StudentStats row (and the monthly rollup) with counters recomputed from the raw records."""
+    stats = compute_student_stats(batch_size)
+    with transaction.atomic():
+        StudentStats.objects.all().delete()
+        StudentStats.objects.bulk_create(stats.values(), batch_size=batch_size)
+        rebuild_monthly_attendance(batch_size)
+    return len(stats)
@@ -0,0 +1,127 @@
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .archive import record_queryset
+from .models import AttendanceRecord, DailyAttendanceSummary
+
+COUNTS = ("present", "absent", "checked_out")
+
+
+def bump_daily_summary(date, location_id, department, **deltas):
+    """
+    Apply +/- deltas to the summary row for (date, location, department),
+    creating it on first use, e.g. bump_daily_summary(today, loc.pk, dept, present=1).
+    """
+    summary, _ = DailyAttendanceSummary.objects.get_or_create(
+        date=date, location_id=location_id, department=department or "",
+    )
+    DailyAttendanceSummary.objects.filter(pk=summary.pk).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+async def abump_daily_summary(date, location_id, department, **deltas):
+    """Async-ORM twin of bump_daily_summary for the ASGI check-in views."""
+    summary, _ = await DailyAttendanceSummary.objects.aget_or_create(
+        date=date, location_id=location_id, department=department or "",
+    )
+    await DailyAttendanceSummary.objects.filter(pk=summary.pk).aupdate(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def summary_totals(**filters):
+    """Sum present/absent/checked_out over the summary rows matching filters."""
+    totals = DailyAttendanceSummary.objects.filter(**filters).aggregate(
+        present=Coalesce(Sum("present"), 0),
+        absent=Coalesce(Sum("absent"), 0),
+        checked_out=Coalesce(Sum("checked_out"), 0),
+    )
+    totals["total"] = totals["present"] + totals["absent"]
+    return totals
+
+
+def _record_counts(records):
+    return (
+        records
+        .values("date", "location")
+        .annotate(
+            present=Count("id", filter=Q(status="Present")),
+            absent=Count("id", filter=Q(status="Absent")),
+            checked_out=Count("id", filter=Q(check_out__isnull=False)),
+        )
+        .order_by()
+    )
+
+
+def _take_from_summary(date, location_id, department, counts):
+    # Floored at zero: a summary that has drifted (rebuild_daily_summary reconciles) mustn't block the change
+    DailyAttendanceSummary.objects.filter(date=date, location_id=location_id, department=department or "").update(
+        **{field: Greatest(F(field) - n, 0) for field, n in counts.items()}
+    )
+
+
+def move_student_summary(student_id, old_department, new_department):
+    """Move a student's counts to another department when it changes (all records, archived ones too)."""
+    with transaction.atomic():
+        for g in _record_counts(record_queryset().filter(student_id=student_id)):
+            counts = {field: g[field] for field in COUNTS if g[field]}
+            _take_from_summary(g["date"], g["location"], old_department, counts)
+            bump_daily_summary(g["date"], g["location"], new_department, **counts)
+
+
+def drop_student_summary(student_id, department):
+    """Take a student's counts out before their records are deleted with them (archived records stay)."""
+    for g in _record_counts(AttendanceRecord.objects.filter(student_id=student_id)):
+        _take_from_summary(g["date"], g["location"], department, {field: g[field] for field in COUNTS if g[field]})
+
+
+def fold_location_summary(location_id):
+    """
+    Before a location is deleted (its records keep their counts, with no location):
+    add its summary rows into the matching no-location rows, then drop them.
+    """
+    with transaction.atomic():
+        rows = DailyAttendanceSummary.objects.filter(location_id=location_id)
+        for row in rows:
+            bump_daily_summary(row.date, None, row.department, **{field: getattr(row, field) for field in COUNTS})
+        rows.delete()
+
+
+def rebuild_daily_summary(start=None, end=None):
+    """Recompute summary rows from AttendanceRecord (optionally for a date range). Returns rows written."""
+    records = record_queryset(start, end)  # archived days included, so their rows survive a full rebuild
+    summaries = DailyAttendanceSummary.objects.all()
+    if start and end:
+        summaries = summaries.filter(date__range=[start, end])
+
+    groups = (
+        records
+        .annotate(dept=Coalesce("student__department", Value("")))
+        .values("date", "location", "dept")
+        .annotate(
+            present=Count("id", filter=Q(status="Present")),
+            absent=Count("id", filter=Q(status="Absent")),
+            checked_out=Count("id", filter=Q(check_out__isnull=False)),
+        )
+        .order_by()
+    )
+
+    rows = [
+        DailyAttendanceSummary(
+            date=g["date"],
+            location_id=g["location"],
+            department=g["dept"],
+            present=g["present"],
+            absent=g["absent"],
+            checked_out=g["checked_out"],
+        )
+        for g in groups
+    ]
+
+    with transaction.atomic():
+        summaries.delete()
+        DailyAttendanceSummary.objects.bulk_create(rows, batch_size=1000)
+
+    return len(rows)
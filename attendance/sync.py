@@ -0,0 +1,201 @@
+import datetime
+import hashlib
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .archive import archived_before
+from .catalogue import get_location_catalogue
+from .credentials import assertion_credential_id, find_credentials
+from .models import Student, WebAuthnCredential, credential_id_hash
+from .utils import bulk_set
+from .writebehind import write_check_ins
+
+# Offline check-in sync: a phone or a lecturer's kiosk records check-ins while the
+# network is down and uploads them later as one JSON batch. Each event is signed
+# on the student's authenticator, with the WebAuthn challenge derived from the
+# event itself (event_challenge), so signing needs no server round-trip and an
+# edited event fails verification. The batch is validated as a whole: one query
+# for the students, one for the credentials the assertions name, the cached
+# geofence index, one vectorized distance computation, then one bulk write
+# (write_check_ins) in a single transaction.
+CLOCK_SKEW = datetime.timedelta(minutes=5)
+
+# Per-event statuses, besides write_check_ins' created / checked_in / already_checked_in
+INVALID = "invalid"
+UNKNOWN_STUDENT = "unknown_student"
+FORBIDDEN = "forbidden"
+NOT_REGISTERED = "not_registered"
+OUT_OF_WINDOW = "out_of_window"
+UNKNOWN_LOCATION = "unknown_location"
+OUTSIDE_GEOFENCE = "outside_geofence"
+BAD_SIGNATURE = "bad_signature"
+DUPLICATE = "duplicate"  # same student and day as an earlier event in the batch
+
+
+def event_challenge(event):
+    """
+    The challenge a device passes to navigator.credentials.get() for an event:
+    SHA-256 over "id|matric_no|timestamp|latitude|longitude|location" exactly as
+    uploaded (location empty when not picked). Send coordinates as strings.
+    """
+    fields = [event.get(name) for name in ("id", "matric_no", "timestamp", "latitude", "longitude", "location")]
+    payload = "|".join("" if value is None else str(value) for value in fields)
+    return hashlib.sha256(payload.encode()).digest()
+
+
+def _coordinate(value, limit, name):
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"{name} is not a number")
+    if not number.is_finite() or abs(number) > limit:
+        raise ValueError(f"{name} is out of range")
+    return number.quantize(Decimal("0.000001"))
+
+
+def _parse(raw):
+    """Validated copy of one uploaded event, or ValueError."""
+    if not isinstance(raw, dict):
+        raise ValueError("event must be an object")
+    missing = [name for name in ("id", "matric_no", "timestamp", "latitude", "longitude", "assertion")
+               if raw.get(name) in (None, "")]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    try:
+        timestamp = parse_datetime(str(raw["timestamp"]))
+    except ValueError:
+        timestamp = None
+    if timestamp is None or timezone.is_naive(timestamp):
+        raise ValueError("timestamp must be ISO 8601 with a UTC offset")
+    location = raw.get("location")
+    if location not in (None, "") and not str(location).isdigit():
+        raise ValueError("location must be a location id")
+    return {
+        "matric_no": str(raw["matric_no"]),
+        "timestamp": timestamp,
+        "latitude": _coordinate(raw["latitude"], 90, "latitude"),
+        "longitude": _coordinate(raw["longitude"], 180, "longitude"),
+        "location": int(location) if location not in (None, "") else None,
+        "assertion": raw["assertion"],
+        "credential_id": assertion_credential_id(raw["assertion"]),
+        "challenge": event_challenge(raw),
+    }
+
+
+def _limits():
+    """Events per upload and how old an event may be (settings.CHECK_IN_SYNC_*)."""
+    return (getattr(settings, "CHECK_IN_SYNC_MAX_EVENTS", 5000),
+            datetime.timedelta(hours=getattr(settings, "CHECK_IN_SYNC_MAX_AGE_HOURS", 72)))
+
+
+def sync_check_ins(events, user, verify, now=None):
+    """
+    Validate and record a batch of offline check-in events (dicts from the JSON
+    body). Staff may upload events for any student, a student only their own.
+    `verify(credential, assertion, challenge)` checks one WebAuthn assertion and
+    returns the result's new_sign_count (the check-in view's verifier).
+
+    Returns one {"id", "status"} result per event, in upload order, with "detail"
+    for rejections and "date"/"location" for accepted check-ins.
+    """
+    max_events, max_age = _limits()
+    if not isinstance(events, list):
+        raise ValueError("events must be a list")
+    if len(events) > max_events:
+        raise ValueError(f"At most {max_events} events per upload; split the batch.")
+
+    now = now or timezone.now()
+    earliest = now - max_age
+    cutoff = archived_before()
+    results = [None] * len(events)
+
+    def reject(i, status, detail):
+        results[i] = {"id": events[i].get("id") if isinstance(events[i], dict) else None,
+                      "status": status, "detail": detail}
+
+    parsed = []
+    for i, raw in enumerate(events):
+        try:
+            parsed.append((i, _parse(raw)))
+        except ValueError as e:
+            reject(i, INVALID, str(e))
+
+    # One query for every student in the batch, one for every credential
+    students = {s.matric_no: s for s in Student.objects.filter(matric_no__in={e["matric_no"] for _, e in parsed})}
+    credentials = find_credentials(e["credential_id"] for _, e in parsed if e["credential_id"])
+    staff = user.is_staff or user.is_superuser
+
+    candidates = []
+    for i, event in parsed:
+        student = students.get(event["matric_no"])
+        event["date"] = timezone.localdate(event["timestamp"])
+        if student is None:
+            reject(i, UNKNOWN_STUDENT, "No student with this matric number.")
+        elif not staff and student.user_id != user.pk:
+            reject(i, FORBIDDEN, "Students can only sync their own check-ins.")
+        elif not earliest <= event["timestamp"] <= now + CLOCK_SKEW:
+            reject(i, OUT_OF_WINDOW, "Check-in time is too old or in the future.")
+        elif cutoff is not None and event["date"] < cutoff:
+            reject(i, OUT_OF_WINDOW, "That day is in an archived semester.")
+        else:
+            credential = event["credential_id"] and credentials.get(credential_id_hash(event["credential_id"]))
+            if not credential or credential.student_id != student.pk:
+                reject(i, NOT_REGISTERED, "Fingerprint is not registered to this student.")
+            else:
+                event["credential"] = credential
+                candidates.append((i, event, student))
+
+    # Geofences: every candidate distance in one vectorized call
+    index = get_location_catalogue().index
+    matches = index.match_many([(e["latitude"], e["longitude"]) for _, e, _ in candidates],
+                               [e["location"] for _, e, _ in candidates])
+    located = []
+    for (i, event, student), (location, _) in zip(candidates, matches):
+        if event["location"] and index.get(event["location"]) is None:
+            reject(i, UNKNOWN_LOCATION, "Unknown location.")
+        elif location is None:
+            reject(i, OUTSIDE_GEOFENCE, "Not within the location's geofence." if event["location"]
+                   else "Not within any registered location.")
+        else:
+            located.append((i, event, student, location))
+
+    # Signatures oldest first, so each credential's sign count only moves forward;
+    # the earliest verified event per student and day wins
+    pending, owners, signed = {}, {}, set()
+    for i, event, student, location in sorted(located, key=lambda item: item[1]["timestamp"]):
+        try:
+            verification = verify(event["credential"], event["assertion"], event["challenge"])
+        except Exception as e:
+            reject(i, BAD_SIGNATURE, f"Fingerprint verification failed: {e}")
+            continue
+        event["credential"].sign_count = verification.new_sign_count
+        signed.add(event["credential"])
+
+        key = (student.pk, event["date"])
+        if key in pending:
+            reject(i, DUPLICATE, "Another event already checks this student in that day.")
+            continue
+        pending[key] = {
+            "check_in": event["timestamp"].astimezone(datetime.timezone.utc).time(),
+            "location_id": location.pk,
+            "latitude": event["latitude"],
+            "longitude": event["longitude"],
+            "department": student.department,
+        }
+        owners[key] = (i, location)
+
+    if pending:
+        with transaction.atomic():
+            outcomes = write_check_ins(pending)
+            bulk_set(WebAuthnCredential, "sign_count", {c.pk: c.sign_count for c in signed})
+        for key, outcome in outcomes.items():
+            i, location = owners[key]
+            results[i] = {"id": events[i]["id"], "status": outcome,
+                          "date": key[1].isoformat(), "location": location.name}
+    elif signed:
+        bulk_set(WebAuthnCredential, "sign_count", {c.pk: c.sign_count for c in signed})
+    return results
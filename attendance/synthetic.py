@@ -0,0 +1,135 @@
+import datetime
+import json
+import math
+import random
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .credentials import b64url_encode
+from .catalogue import invalidate_location_catalogue
+from .importers import DEFAULT_PASSWORD
+from .models import AttendanceRecord, Location, Student, WebAuthnCredential, credential_id_hash
+from .pagecache import LOCATION, RECORD, STUDENT, touch
+from .stats import rebuild_student_stats
+from .summary import rebuild_daily_summary
+
+# The campus labs seeded by 0002_add_initial_locations; synthetic ones are scattered around them
+CAMPUS = [(7.3775, 3.9470), (7.3780, 3.9500), (7.3800, 3.9520)]
+USERNAME_PREFIX = "SYN"
+LOCATION_PREFIX = "Synthetic Lab"
+DEPARTMENTS = ["Computer Science", "Physics", "Mathematics", "Chemistry", "Statistics",
+               "Electrical Engineering", "Biochemistry", "Economics"]
+FIRST_NAMES = ["Ada", "Alan", "Grace", "Tunde", "Ngozi", "Chinedu", "Amina", "Kemi", "Ibrahim", "Funmi"]
+LAST_NAMES = ["Okafor", "Adeyemi", "Bello", "Eze", "Lovelace", "Turing", "Hopper", "Balogun", "Musa", "Obi"]
+BATCH_SIZE = 5000
+METRES_PER_DEGREE = 111320
+
+
+@dataclass
+class SeedResult:
+    students: int = 0
+    locations: int = 0
+    records: int = 0
+    elapsed: float = 0.0
+
+
+def _jitter(rng, lat, lon, metres):
+    """A point up to `metres` away from (lat, lon)."""
+    angle, distance = rng.uniform(0, 2 * math.pi), rng.uniform(0, metres)
+    dlat = distance * math.cos(angle) / METRES_PER_DEGREE
+    dlon = distance * math.sin(angle) / (METRES_PER_DEGREE * math.cos(math.radians(lat)))
+    return Decimal(f"{lat + dlat:.6f}"), Decimal(f"{lon + dlon:.6f}")
+
+
+def placeholder_credential(student_id, username):
+    """Unsaved stand-in credential (ID = the username) for bulk_create; benchmarks mock the signature check."""
+    credential_id = username.encode()
+    return WebAuthnCredential(student_id=student_id, credential_id=credential_id,
+                              credential_id_hash=credential_id_hash(credential_id), public_key=b"synthetic")
+
+
+def placeholder_assertion(username):
+    """Check-in form value naming the placeholder credential of `username`."""
+    return json.dumps({"rawId": b64url_encode(username.encode())})
+
+
+def clear_synthetic():
+    """Delete everything a previous seed_synthetic run created (records cascade with students)."""
+    User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+    Location.objects.filter(name__startswith=LOCATION_PREFIX).delete()
+    rebuild_daily_summary()
+
+
+def seed_synthetic(students, locations, days, start=None, present_rate=0.8, seed=42, batch_size=BATCH_SIZE):
+    """
+    Generate `students` students, `locations` extra locations within ~500 m of
+    the campus labs and `days` days of attendance ending yesterday (or starting
+    at `start`), all with bulk_create. Students get placeholder WebAuthn
+    credentials so the check-in path can be exercised by benchmarks.
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    start = start or timezone.localdate() - datetime.timedelta(days=days)
+    password = make_password(DEFAULT_PASSWORD)
+    offset = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+
+    with transaction.atomic():
+        new_locations = []
+        for i in range(locations):
+            lat, lon = _jitter(rng, *CAMPUS[i % len(CAMPUS)], metres=500)
+            new_locations.append(Location(name=f"{LOCATION_PREFIX} {i + 1}", latitude=lat, longitude=lon,
+                                          allowed_radius=rng.choice([30, 50, 80])))
+        Location.objects.bulk_create(new_locations, batch_size=batch_size)
+        sites = list(Location.objects.all())
+
+        usernames = [f"{USERNAME_PREFIX}{offset + i:07}" for i in range(students)]
+        User.objects.bulk_create([
+            User(username=username, password=password,
+                 first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES))
+            for username in usernames
+        ], batch_size=batch_size)
+        user_ids = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+        Student.objects.bulk_create([
+            Student(user_id=user_ids[username], matric_no=username, department=rng.choice(DEPARTMENTS))
+            for username in usernames
+        ], batch_size=batch_size)
+        student_ids = dict(Student.objects.filter(matric_no__in=usernames).values_list("matric_no", "id"))
+        WebAuthnCredential.objects.bulk_create([
+            placeholder_credential(student_id, username) for username, student_id in student_ids.items()
+        ], batch_size=batch_size)
+        student_ids = list(student_ids.values())
+
+        records, batch = 0, []
+        for day in range(days):
+            date = start + datetime.timedelta(days=day)
+            for student_id in student_ids:
+                if rng.random() < present_rate:
+                    site = rng.choice(sites)
+                    lat, lon = _jitter(rng, float(site.latitude), float(site.longitude), site.allowed_radius)
+                    batch.append(AttendanceRecord(
+                        student_id=student_id, date=date, status="Present", location=site,
+                        latitude=lat, longitude=lon,
+                        check_in=datetime.time(8, rng.randrange(60)),
+                        check_out=datetime.time(rng.randrange(12, 17), rng.randrange(60)) if rng.random() < 0.7 else None,
+                    ))
+                else:
+                    batch.append(AttendanceRecord(student_id=student_id, date=date, status="Absent"))
+                if len(batch) >= batch_size:
+                    AttendanceRecord.objects.bulk_create(batch)
+                    records += len(batch)
+                    batch = []
+        AttendanceRecord.objects.bulk_create(batch)
+        records += len(batch)
+
+        rebuild_daily_summary()
+        rebuild_student_stats()
+        touch(STUDENT, LOCATION, RECORD)
+        invalidate_location_catalogue()  # bulk_create sends no post_save for the new locations
+
+    return SeedResult(len(student_ids), len(new_locations), records, time.perf_counter() - started)
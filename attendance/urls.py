@@ -1,29 +1,42 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'attendance'
 
+# Under ASGI (uvicorn/daphne) serve check-in/out from the async-ORM views
+if getattr(settings, "ASYNC_CHECK_IN", False):
+    check_in_view, check_out_view = views.check_in_async, views.check_out_async
+else:
+    check_in_view, check_out_view = views.check_in, views.check_out
+
 urlpatterns = [
     path('', views.redirect_dashboard, name='attendance_home'),
     path('student-dashboard/', views.StudentDashboardView.as_view(), name='student_dashboard'),
     path('admin-dashboard/', views.AdminDashboardView.as_view(), name='admin_dashboard'),
     path('my-records/', views.MyRecordsView.as_view(), name='my_records'),
     path('all-records/', views.AllRecordsView.as_view(), name='all_records'),
-    path('check-in/', views.check_in, name='check_in'),
-    path('check-out/', views.check_out, name='check_out'),
+    path('check-in/', check_in_view, name='check_in'),
+    path('check-out/', check_out_view, name='check_out'),
+    path('check-in/async/', views.check_in_async, name='check_in_async'),
+    path('check-in/sync/', views.check_in_sync, name='check_in_sync'),
+    path('check-out/async/', views.check_out_async, name='check_out_async'),
     path('export-csv/', views.export_csv, name='export_csv'),
     path("students/", views.StudentListView.as_view(), name="student_list"),
     path("students/add/", views.StudentCreateView.as_view(), name="student_add"),
+    path("students/search/", views.student_search, name="student_search"),
+    path("students/import/", views.StudentImportView.as_view(), name="student_import"),
     path("students/<int:pk>/edit/", views.StudentUpdateView.as_view(), name="student_edit"),
     path("students/<int:pk>/delete/", views.StudentDeleteView.as_view(), name="student_delete"),
     path("locations/", views.LocationListView.as_view(), name="location_list"),
     path("reports/", views.ReportView.as_view(), name="reports"),
     path('locations/<int:pk>/edit/', views.LocationUpdateView.as_view(), name='location_edit'),
     path("records/", views.AdminRecordsView.as_view(), name="admin_records"),
+    path("metrics/", views.metrics, name="metrics"),
     path("fingerprint/register/", views.register_fingerprint_page, name="register_fingerprint_page"),
     path('webauthn/register/begin/', views.webauthn_register_begin, name='webauthn_register_begin'),
     path('webauthn/register/complete/', views.webauthn_register_complete, name='webauthn_register_complete'),
-    path('webauthn/authenticate/complete/', views.webauthn_authenticate_begin, name='webauthn_authenticate_begin'),
+    path('webauthn/authenticate/begin/', views.webauthn_authenticate_begin, name='webauthn_authenticate_begin'),
     path('webauthn/authenticate/complete/', views.webauthn_authenticate_complete, name='webauthn_authenticate_complete'),
 
 ]
\ No newline at end of file
@@ -1,5 +1,13 @@
 import math
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional — calculate_distances falls back to pure Python
+    np = None
+
+R = 6371000  # Earth radius in meters
+
+
 def calculate_distance(lat1, lon1, lat2, lon2):
     # Convert Decimal → float
     lat1 = float(lat1)
@@ -7,8 +15,6 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     lat2 = float(lat2)
     lon2 = float(lon2)
 
-    R = 6371000  # Earth radius in meters
-
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
     delta_phi = math.radians(lat2 - lat1)
@@ -18,3 +24,74 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
     return R * c
+
+
+def calculate_distances(lats1, lons1, lats2, lons2):
+    """
+    Haversine distance in meters between many pairs of points.
+
+    Arguments are equal-length sequences (Decimal, float or str values); any
+    of them may also be a single number, which is applied to every pair —
+    e.g. many GPS fixes against one Location. Returns a NumPy float array
+    when NumPy is installed, otherwise a list of floats with the same values.
+    """
+    if np is not None:
+        return _calculate_distances_numpy(lats1, lons1, lats2, lons2)
+    return _calculate_distances_python(lats1, lons1, lats2, lons2)
+
+
+def _calculate_distances_numpy(lats1, lons1, lats2, lons2):
+    phi1 = np.radians(np.asarray(lats1, dtype=float))
+    lam1 = np.radians(np.asarray(lons1, dtype=float))
+    phi2 = np.radians(np.asarray(lats2, dtype=float))
+    lam2 = np.radians(np.asarray(lons2, dtype=float))
+
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin((lam2 - lam1) / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return R * c
+
+
+def _calculate_distances_python(lats1, lons1, lats2, lons2):
+    columns = [lats1, lons1, lats2, lons2]
+    size = max((len(col) for col in columns if not _is_scalar(col)), default=1)
+
+    # Broadcast single numbers to the length of the other columns
+    columns = [[col] * size if _is_scalar(col) else col for col in columns]
+    if any(len(col) != size for col in columns):
+        raise ValueError("calculate_distances() arguments must have the same length")
+
+    return [calculate_distance(*point) for point in zip(*columns)]
+
+
+def _is_scalar(value):
+    return isinstance(value, (int, float, str)) or not hasattr(value, "__len__")
+
+
+def bulk_set(model, field_name, values, batch_size=500):
+    """
+    Set one column to a per-row value, {pk: value}, with one UPDATE ... CASE per
+    batch. Same SQL as QuerySet.bulk_update(), minus the ORM expression it builds
+    for every row, which dominates its cost at thousands of rows.
+    """
+    from django.db import connections, router
+
+    conn = connections[router.db_for_write(model)]
+    field, pk = model._meta.get_field(field_name), model._meta.pk
+    qn = conn.ops.quote_name
+    # PostgreSQL can't infer the type of a CASE built from bare parameters
+    then = f"CAST(%s AS {field.db_type(conn)})" if conn.features.requires_casted_case_in_updates else "%s"
+    items = list(values.items())
+    with conn.cursor() as cursor:
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            params = []
+            for key, value in batch:
+                params += [pk.get_db_prep_value(key, conn), field.get_db_prep_save(value, conn)]
+            params += [pk.get_db_prep_value(key, conn) for key, _ in batch]
+            cursor.execute(
+                f"UPDATE {qn(model._meta.db_table)} SET {qn(field.column)} = CASE {qn(pk.column)} "
+                f"{' '.join([f'WHEN %s THEN {then}'] * len(batch))} END "
+                f"WHERE {qn(pk.column)} IN ({', '.join(['%s'] * len(batch))})",
+                params,
+            )
@@ -1,25 +1,53 @@
+from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.utils.decorators import method_decorator
 from django.shortcuts import redirect, render, get_object_or_404
 from django.utils import timezone
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+import asyncio
 import csv
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView
+import logging
+from asgiref.sync import sync_to_async
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView, FormView
 from django.urls import reverse_lazy
-from .models import Student, AttendanceRecord, Location
+from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q, Sum
+from django.db.models.functions import Coalesce
+from .models import Student, AttendanceRecord, Location, DailyAttendanceSummary, StudentStats, WebAuthnCredential
 from .forms import DateRangeForm
 from .utils import calculate_distance
+from .catalogue import get_location_catalogue
+from .challenges import AUTHENTICATE, LOGIN, REGISTER, VERIFY, get_challenge_store, login_challenge_allowed
+from .credentials import afind_credential, assertion_challenge, b64url_decode, b64url_encode, find_credential
+from .summary import abump_daily_summary, bump_daily_summary, summary_totals
+from .stats import (
+    arecord_check_out, arecord_late_check_in, arecord_session,
+    record_check_out, record_late_check_in, record_session,
+)
+from . import reports
+from .archive import archived_before, record_queryset
+from . import exporters
+from .pagination import KeysetPaginationMixin
+from .pagecache import RECORD, STUDENT, PageCacheMixin, cached
+from .sync import sync_check_ins
+from .search import TYPEAHEAD_LIMIT, TYPEAHEAD_MAX_LIMIT, search_students, typeahead
+from .writebehind import get_check_in_queue
 from django.contrib.auth.mixins import  UserPassesTestMixin
 from django.contrib.auth.models import User
-from .forms import StudentForm
+from .forms import StudentForm, StudentImportForm
+from .importers import import_students, read_roster
 from webauthn.helpers import options_to_json
 from webauthn.helpers.structs import PublicKeyCredentialRequestOptions
 from webauthn import verify_authentication_response
-import os, json, base64
+import os, json
 from django.http import JsonResponse, HttpResponseNotAllowed
 from django.conf import settings
+from .instrumentation import registry
+
+logger = logging.getLogger(__name__)
 
 # ---------------- UTILS ----------------
 def staff_or_admin(user):
@@ -45,92 +73,304 @@ class StudentDashboardView(TemplateView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        student = get_object_or_404(Student, user=self.request.user)
+        # Two queries: the student with their precomputed counters (and whether they
+        # registered a credential, filling Student.fingerprint_registered), then the last 10 records
+        student = get_object_or_404(
+            Student.objects.select_related('stats').annotate(
+                fingerprint_registered=Exists(WebAuthnCredential.objects.filter(student=OuterRef('pk')))
+            ),
+            user=self.request.user,
+        )
         today = timezone.localdate()
+        records = list(AttendanceRecord.objects.filter(student=student).order_by('-date')[:10])
+        catalogue = get_location_catalogue()
+        for record in records:
+            if record.location_id:
+                # Fill the FK cache from the catalogue instead of a query per row
+                record.location = catalogue.get(record.location_id)
 
-        ctx['student'] = student  # ✅ ADD THIS LINE
-        ctx['today_record'] = AttendanceRecord.objects.filter(student=student, date=today).first()
-        ctx['now'] = timezone.now()
-        ctx['records'] = AttendanceRecord.objects.filter(student=student).order_by('-date')[:10]
-        ctx['locations'] = Location.objects.all()
         ctx['student'] = student
-
+        ctx['stats'] = getattr(student, 'stats', None) or StudentStats(student=student)
+        ctx['today_record'] = records[0] if records and records[0].date == today else None
+        ctx['now'] = timezone.now()
+        ctx['records'] = records
+        ctx['locations'] = catalogue.locations
 
         return ctx
 
 
 
+def _verify_fingerprint(credential, assertion, challenge):
+    """CPU-bound WebAuthn signature check against one credential; returns the library's verification result."""
+    return verify_authentication_response(
+        credential=assertion,
+        expected_challenge=challenge,
+        expected_rp_id="your-domain.com",  # 🔹 replace with your domain
+        expected_origin="https://your-domain.com",  # 🔹 replace with your frontend origin
+        credential_public_key=credential.public_key,
+        credential_current_sign_count=credential.sign_count,
+        require_user_verification=True,
+    )
+
+
+def _resolve_check_in_location(index, location_id, user_lat, user_lon):
+    """Pick the geofence for a check-in. Returns (location, error message)."""
+    if location_id:
+        # Student picked a lab explicitly → validate against that geofence only
+        location = index.get(location_id)
+        if location is None:
+            return None, "❌ Unknown location."
+
+        allowed_radius = float(location.allowed_radius)
+        distance = calculate_distance(user_lat, user_lon, location.latitude, location.longitude)
+        logger.debug("📍 Distance from %s: %.2fm (allowed: %sm)", location.name, distance, allowed_radius)
+
+        if distance > allowed_radius:
+            return None, f"❌ Too far from {location.name}. Move closer to check in."
+        return location, None
+
+    # No lab picked → find the closest geofence containing the student
+    location, distance = index.match(user_lat, user_lon)
+    if location is None:
+        return None, "❌ You are not within any registered location."
+
+    logger.debug("📍 Matched %s at %.2fm", location.name, distance)
+    return location, None
+
+
 @login_required
 def check_in(request):
     """Handle student check-in with GPS validation, fingerprint verification, and duplicate prevention."""
-    student = get_object_or_404(Student, user=request.user)
-
-    # ✅ Step 0: Ensure student has registered a fingerprint
-    if not student.webauthn_credential_id or not student.webauthn_public_key:
-        messages.error(request, "⚠️ You must register your fingerprint before checking in.")
-        return redirect("attendance:student_dashboard")
-
     if request.method == "POST":
         location_id = request.POST.get("location")
         user_lat = request.POST.get("latitude")
         user_lon = request.POST.get("longitude")
         assertion = request.POST.get("assertion")
 
-        # ✅ Step 1: Ensure all required data
-        if not location_id or not user_lat or not user_lon:
-            messages.error(request, "⚠️ Missing location or GPS data.")
+        # ✅ Step 1: Ensure all required data (location is optional — we can match it from GPS)
+        if not user_lat or not user_lon:
+            messages.error(request, "⚠️ Missing GPS data.")
             return redirect("attendance:student_dashboard")
 
         if not assertion:
             messages.error(request, "⚠️ Fingerprint verification required.")
             return redirect("attendance:student_dashboard")
 
-        # ✅ Step 2: Fingerprint verification
+        # ✅ Step 2: Fingerprint verification. The credential the assertion was made
+        # with is one indexed lookup, and brings the student along
+        credential = find_credential(assertion)
+        if credential is None or credential.student.user_id != request.user.pk:
+            messages.error(request, "⚠️ Register this fingerprint to your account before checking in.")
+            return redirect("attendance:student_dashboard")
+        student = credential.student
+
         try:
-            if "webauthn_challenge" not in request.session:
+            challenge = get_challenge_store().pop(AUTHENTICATE, request.user.pk)
+            if challenge is None:
                 messages.error(request, "⚠️ Fingerprint challenge expired. Try again.")
                 return redirect("attendance:student_dashboard")
 
-            verification = verify_authentication_response(
-                credential=assertion,
-                expected_challenge=request.session.pop("webauthn_challenge"),
-                expected_rp_id="your-domain.com",  # 🔹 replace with your domain
-                expected_origin="https://your-domain.com",  # 🔹 replace with your frontend origin
-                credential_public_key=student.webauthn_public_key,
-                credential_current_sign_count=student.webauthn_sign_count,
-                require_user_verification=True,
-            )
+            verification = _verify_fingerprint(credential, assertion, challenge)
 
             # Update sign count (prevent replay attacks)
-            student.webauthn_sign_count = verification.new_sign_count
-            student.save()
+            credential.sign_count = verification.new_sign_count
+            credential.save(update_fields=["sign_count"])
 
         except Exception as e:
-            print("⚠️ Fingerprint verification failed:", e)
+            logger.warning("⚠️ Fingerprint verification failed for %s: %s", student.matric_no, e)
             messages.error(request, "❌ Fingerprint verification failed. Try again.")
             return redirect("attendance:student_dashboard")
 
         # ✅ Step 3: GPS & Attendance handling
         try:
-            location = get_object_or_404(Location, id=location_id)
-
             user_lat, user_lon = float(user_lat), float(user_lon)
-            loc_lat, loc_lon = float(location.latitude), float(location.longitude)
-            allowed_radius = float(location.allowed_radius)
+            location, error = _resolve_check_in_location(
+                get_location_catalogue().index, location_id, user_lat, user_lon
+            )
+            if error:
+                messages.error(request, error)
+                return redirect("attendance:student_dashboard")
 
-            distance = calculate_distance(user_lat, user_lon, loc_lat, loc_lon)
-            print(f"📍 Distance from {location.name}: {distance:.2f}m (allowed: {allowed_radius}m)")
+            today = timezone.localdate()
+            if settings.CHECK_IN_WRITE_BEHIND:
+                # Acknowledge now; the background flusher bulk-inserts the record within milliseconds
+                already = AttendanceRecord.objects.filter(student=student, date=today, check_in__isnull=False).exists()
+                if not already and get_check_in_queue().enqueue(
+                    student.pk, today, timezone.now().time(), location.pk, user_lat, user_lon, student.department
+                ):
+                    messages.success(request, f"✅ Checked in successfully at {location.name}.")
+                else:
+                    messages.info(request, "ℹ️ Already checked in today.")
+                return redirect("attendance:student_dashboard")
+
+            now = timezone.now()
+            with transaction.atomic():
+                record, created = AttendanceRecord.objects.get_or_create(
+                    student=student,
+                    date=today,
+                    defaults={
+                        "check_in": now,
+                        "location": location,
+                        "status": "Present",
+                        "latitude": user_lat,
+                        "longitude": user_lon,
+                    }
+                )
+
+                if not created:  # record exists
+                    if record.check_in:
+                        messages.info(request, f"ℹ️ Already checked in today at {record.location.name}.")
+                    else:
+                        was_absent = record.status == "Absent"
+                        if was_absent:
+                            bump_daily_summary(record.date, record.location_id, student.department, absent=-1)
+                        record.check_in = now
+                        record.location = location
+                        record.status = "Present"
+                        record.latitude = user_lat
+                        record.longitude = user_lon
+                        record.save()
+                        bump_daily_summary(record.date, location.pk, student.department, present=1)
+                        record_late_check_in(student.pk, record.date, now, was_absent)
+                        messages.success(request, f"✅ Checked in successfully at {location.name}.")
+                else:
+                    bump_daily_summary(record.date, location.pk, student.department, present=1)
+                    record_session(student.pk, record.date, present=True, at=now)
+                    messages.success(request, f"✅ Checked in successfully at {location.name}.")
+
+        except Exception as e:
+            logger.exception("⚠️ Error during check_in")
+            messages.error(request, f"Unexpected error: {e}")
+
+    return redirect("attendance:student_dashboard")
 
-            if distance > allowed_radius:
-                messages.error(request, f"❌ Too far from {location.name}. Move closer to check in.")
+@login_required
+def check_out(request):
+    student = get_object_or_404(Student, user=request.user)
+    today = timezone.localdate()
+    record = AttendanceRecord.objects.filter(student=student, date=today).first()
+
+    if not record or not record.check_in:
+        messages.error(request, 'You have not checked in today.')
+    elif record.check_out:
+        messages.info(request, 'You already checked out today.')
+    else:
+        with transaction.atomic():
+            record.check_out = timezone.now()
+            record.save()
+            bump_daily_summary(record.date, record.location_id, student.department, checked_out=1)
+            record_check_out(student.pk, record.check_out)
+        messages.success(request, 'Checked out successfully!')
+    return redirect('attendance:student_dashboard')
+
+
+@login_required
+def check_in_sync(request):
+    """
+    Offline check-ins uploaded as one JSON batch: {"events": [{"id", "matric_no",
+    "timestamp", "latitude", "longitude", "location"?, "assertion"}, ...]}.
+    Answers {"results": [...], "counts": {...}} with one result per event.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    # Thousands of events outgrow DATA_UPLOAD_MAX_MEMORY_SIZE, so the body is read as a stream under its own cap
+    if int(request.META.get("CONTENT_LENGTH") or 0) > settings.CHECK_IN_SYNC_MAX_BYTES:
+        return JsonResponse({"error": "Upload too large; split the batch."}, status=413)
+
+    try:
+        payload = json.load(request)
+        results = sync_check_ins(payload["events"], request.user, _verify_fingerprint)
+    except (ValueError, KeyError, TypeError) as e:
+        return JsonResponse({"error": f"Invalid batch: {e}"}, status=400)
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    logger.info("📶 Synced %d offline check-ins for %s: %s", len(results), request.user, counts)
+    return JsonResponse({"results": results, "counts": counts})
+
+
+# ---------------- STUDENT (ASGI) ----------------
+# Same flow as check_in/check_out on Django's async ORM, for ASGI deployments
+# (ASYNC_CHECK_IN=1). The async ORM has no transactions, so the record write
+# and its summary bump are two statements; rebuild_daily_summary reconciles.
+async def _aget_student(request):
+    user = await request.auser()
+    try:
+        return await Student.objects.aget(user=user)
+    except Student.DoesNotExist:
+        raise Http404("No Student matches the given query.")
+
+
+@login_required
+async def check_in_async(request):
+    if request.method == "POST":
+        location_id = request.POST.get("location")
+        user_lat = request.POST.get("latitude")
+        user_lon = request.POST.get("longitude")
+        assertion = request.POST.get("assertion")
+
+        if not user_lat or not user_lon:
+            messages.error(request, "⚠️ Missing GPS data.")
+            return redirect("attendance:student_dashboard")
+
+        if not assertion:
+            messages.error(request, "⚠️ Fingerprint verification required.")
+            return redirect("attendance:student_dashboard")
+
+        user = await request.auser()
+        credential = await afind_credential(assertion)
+        if credential is None or credential.student.user_id != user.pk:
+            messages.error(request, "⚠️ Register this fingerprint to your account before checking in.")
+            return redirect("attendance:student_dashboard")
+        student = credential.student
+
+        try:
+            challenge = await get_challenge_store().apop(AUTHENTICATE, user.pk)
+            if challenge is None:
+                messages.error(request, "⚠️ Fingerprint challenge expired. Try again.")
                 return redirect("attendance:student_dashboard")
 
-            today = timezone.localdate()
-            record, created = AttendanceRecord.objects.get_or_create(
+            # Signature check is CPU-bound → keep it off the event loop
+            verification = await asyncio.to_thread(_verify_fingerprint, credential, assertion, challenge)
+
+            credential.sign_count = verification.new_sign_count
+            await credential.asave(update_fields=["sign_count"])
+
+        except Exception as e:
+            logger.warning("⚠️ Fingerprint verification failed for %s: %s", student.matric_no, e)
+            messages.error(request, "❌ Fingerprint verification failed. Try again.")
+            return redirect("attendance:student_dashboard")
+
+        try:
+            user_lat, user_lon = float(user_lat), float(user_lon)
+            index = (await sync_to_async(get_location_catalogue)()).index
+            location, error = _resolve_check_in_location(index, location_id, user_lat, user_lon)
+            if error:
+                messages.error(request, error)
+                return redirect("attendance:student_dashboard")
+
+            today, now = timezone.localdate(), timezone.now()
+            if settings.CHECK_IN_WRITE_BEHIND:
+                # As check_in: acknowledge now, the flusher bulk-inserts the record
+                already = await AttendanceRecord.objects.filter(
+                    student=student, date=today, check_in__isnull=False
+                ).aexists()
+                # The queue is a local SQLite file: enqueue off the event loop
+                if not already and await asyncio.to_thread(
+                    get_check_in_queue().enqueue,
+                    student.pk, today, now.time(), location.pk, user_lat, user_lon, student.department,
+                ):
+                    messages.success(request, f"✅ Checked in successfully at {location.name}.")
+                else:
+                    messages.info(request, "ℹ️ Already checked in today.")
+                return redirect("attendance:student_dashboard")
+
+            record, created = await AttendanceRecord.objects.aget_or_create(
                 student=student,
                 date=today,
                 defaults={
-                    "check_in": timezone.now(),
+                    "check_in": now,
                     "location": location,
                     "status": "Present",
                     "latitude": user_lat,
@@ -138,31 +378,40 @@ def check_in(request):
                 }
             )
 
-            if not created:  # record exists
+            if not created:
                 if record.check_in:
-                    messages.info(request, f"ℹ️ Already checked in today at {record.location.name}.")
+                    previous = index.get(record.location_id)
+                    messages.info(request, f"ℹ️ Already checked in today at {previous.name if previous else '—'}.")
                 else:
-                    record.check_in = timezone.now()
+                    was_absent = record.status == "Absent"
+                    if was_absent:
+                        await abump_daily_summary(record.date, record.location_id, student.department, absent=-1)
+                    record.check_in = now
                     record.location = location
                     record.status = "Present"
                     record.latitude = user_lat
                     record.longitude = user_lon
-                    record.save()
+                    await record.asave()
+                    await abump_daily_summary(record.date, location.pk, student.department, present=1)
+                    await arecord_late_check_in(student.pk, record.date, now, was_absent)
                     messages.success(request, f"✅ Checked in successfully at {location.name}.")
             else:
+                await abump_daily_summary(record.date, location.pk, student.department, present=1)
+                await arecord_session(student.pk, record.date, present=True, at=now)
                 messages.success(request, f"✅ Checked in successfully at {location.name}.")
 
         except Exception as e:
-            print("⚠️ Error during check_in:", e)
+            logger.exception("⚠️ Error during check_in")
             messages.error(request, f"Unexpected error: {e}")
 
     return redirect("attendance:student_dashboard")
 
+
 @login_required
-def check_out(request):
-    student = get_object_or_404(Student, user=request.user)
+async def check_out_async(request):
+    student = await _aget_student(request)
     today = timezone.localdate()
-    record = AttendanceRecord.objects.filter(student=student, date=today).first()
+    record = await AttendanceRecord.objects.filter(student=student, date=today).afirst()
 
     if not record or not record.check_in:
         messages.error(request, 'You have not checked in today.')
@@ -170,13 +419,15 @@ def check_out(request):
         messages.info(request, 'You already checked out today.')
     else:
         record.check_out = timezone.now()
-        record.save()
+        await record.asave(update_fields=["check_out"])
+        await abump_daily_summary(record.date, record.location_id, student.department, checked_out=1)
+        await arecord_check_out(student.pk, record.check_out)
         messages.success(request, 'Checked out successfully!')
     return redirect('attendance:student_dashboard')
 
 
 @method_decorator(login_required, name='dispatch')
-class MyRecordsView(ListView):
+class MyRecordsView(KeysetPaginationMixin, ListView):
     model = AttendanceRecord
     template_name = 'attendance/my_records.html'
     context_object_name = 'records'
@@ -184,96 +435,161 @@ class MyRecordsView(ListView):
 
     def get_queryset(self):
         student = get_object_or_404(Student, user=self.request.user)
-        return AttendanceRecord.objects.filter(student=student).order_by('-date')
+        # Closed semesters are archived: only read them when asked (?archived=1)
+        archived = self.request.GET.get('archived') == '1'
+        return record_queryset(archived=archived).filter(student=student).order_by('-date')
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx['archived_before'] = archived_before()
+        return ctx
 
 
 # ---------------- ADMIN ----------------
 @method_decorator([login_required, user_passes_test(staff_or_admin)], name='dispatch')
-class AdminDashboardView(TemplateView):
+class AdminDashboardView(PageCacheMixin, TemplateView):
     template_name = 'attendance/admin_dashboard.html'
+    page_cache_models = (STUDENT, RECORD)
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         today = timezone.localdate()
+        ctx['today'] = today
 
-        # Total students
-        total_students = Student.objects.count()
-        ctx['total_students'] = total_students
-
-        # Total attendance records
-        ctx['total_records'] = AttendanceRecord.objects.count()
-
-        # Attendance today
-        today_records = AttendanceRecord.objects.filter(date=today)
-        present_today = today_records.filter(status="Present").count()
-        absent_today = total_students - present_today if total_students else 0
-
-        ctx['today_records'] = today_records
-        ctx['present_today'] = present_today
-        ctx['absent_today'] = absent_today
-        ctx['today_records_count'] = today_records.count()
+        # Counters are cached until a student or record changes; the tables below
+        # are lazy querysets, only run when the template's fragment cache misses
+        ctx.update(cached("admin_dashboard", [self.page_stamp, today], lambda: self.counters(today)))
+        ctx['today_records'] = (
+            AttendanceRecord.objects
+            .filter(date=today)
+            .select_related("student__user")
+        )
 
         # Recent 10 records (with student relation)
         ctx['recent_records'] = (
             AttendanceRecord.objects
-            .select_related("student")
+            .select_related("student__user")
             .order_by("-date")[:10]
         )
 
         return ctx
 
+    def counters(self, today):
+        total_students = Student.objects.count()
+
+        # Record counters (overall + today) from the pre-aggregated daily summary
+        counts = DailyAttendanceSummary.objects.aggregate(
+            total_present=Coalesce(Sum('present'), 0),
+            total_absent=Coalesce(Sum('absent'), 0),
+            present_today=Coalesce(Sum('present', filter=Q(date=today)), 0),
+            recorded_absent_today=Coalesce(Sum('absent', filter=Q(date=today)), 0),
+        )
+        present_today = counts['present_today']
+        return {
+            'total_students': total_students,
+            'total_records': counts['total_present'] + counts['total_absent'],
+            'present_today': present_today,
+            'absent_today': total_students - present_today if total_students else 0,
+            'today_records_count': present_today + counts['recorded_absent_today'],
+        }
+
 
 @method_decorator([login_required, user_passes_test(staff_or_admin)], name='dispatch')
-class AllRecordsView(ListView):
+class AllRecordsView(KeysetPaginationMixin, ListView):
     model = AttendanceRecord
     template_name = 'attendance/all_records.html'
     context_object_name = 'records'
     paginate_by = 50
 
+    def get_date_range(self):
+        start = self.request.GET.get('start_date')
+        end = self.request.GET.get('end_date')
+        return (start, end) if start and end else None
+
     def get_queryset(self):
-        qs = AttendanceRecord.objects.select_related('student__user', 'location').order_by('-date', '-check_in')
-        start = self.request.GET.get('start')
-        end = self.request.GET.get('end')
-        if start and end:
-            qs = qs.filter(date__range=[start, end])
-        return qs
+        date_range = self.get_date_range()
+        # Without a date range, closed (archived) semesters are only read when asked (?archived=1)
+        archived = date_range is not None or self.request.GET.get('archived') == '1'
+        return (
+            record_queryset(*(date_range or (None, None)), archived=archived)
+            .select_related('student__user', 'location').order_by('-date', '-check_in')
+        )
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        qs = self.get_queryset()
+        date_range = self.get_date_range()
+        totals = summary_totals(**({'date__range': date_range} if date_range else {}))
         ctx['form'] = DateRangeForm(self.request.GET or None)
-        ctx['total'] = qs.count()
-        ctx['present'] = qs.filter(status="Present").count()
-        ctx['absent'] = qs.filter(status="Absent").count()
+        ctx['archived_before'] = archived_before()
+        ctx['total'] = totals['total']
+        ctx['present'] = totals['present']
+        ctx['absent'] = totals['absent']
         return ctx
 
 
+class Echo:
+    """File-like object whose write() just hands the line back, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+EXPORT_CHUNK_SIZE = 2000  # rows fetched per round-trip (server-side cursor on PostgreSQL)
+
+
+def stream_csv_rows(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
 @login_required
 @user_passes_test(staff_or_admin)
 def export_csv(request):
+    """CSV by default; ?format=parquet or ?format=arrow for typed columnar files (?columns=date,status,...)."""
     form = DateRangeForm(request.GET or None)
     if form.is_valid():
-        start, end = form.cleaned_data['start'], form.cleaned_data['end']
-        rows = AttendanceRecord.objects.filter(date__range=[start, end]).values_list(
+        start, end = form.cleaned_data['start_date'], form.cleaned_data['end_date']
+        fmt = request.GET.get('format', 'csv')
+        if fmt in exporters.FORMATS:
+            return export_columnar(request, fmt, start, end)
+
+        rows = record_queryset(start, end).order_by('date', 'id').values_list(
             'student__user__username', 'date', 'check_in', 'check_out', 'status', 'location__name'
-        )
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
 
-        response = HttpResponse(content_type='text/csv')
+        header = ['Username', 'Date', 'Check In', 'Check Out', 'Status', 'Location']
+        response = StreamingHttpResponse(stream_csv_rows(header, rows), content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename="attendance_{start}_{end}.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(['Username', 'Date', 'Check In', 'Check Out', 'Status', 'Location'])
-        for row in rows:
-            writer.writerow(row)
         return response
 
     messages.error(request, 'Invalid date range')
     return redirect('attendance:all_records')
 
-class StudentListView(ListView):
+
+def export_columnar(request, fmt, start, end):
+    try:
+        columns = exporters.parse_columns(request.GET.get('columns'))
+        exporters.arrow_schema(columns)  # fails fast when pyarrow is missing
+    except ValueError as exc:
+        messages.error(request, f"❌ {exc}")
+        return redirect('attendance:all_records')
+
+    extension, content_type = exporters.FORMATS[fmt]
+    response = StreamingHttpResponse(exporters.stream_export(fmt, start, end, columns), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="attendance_{start}_{end}.{extension}"'
+    return response
+
+class StudentListView(PageCacheMixin, ListView):
     model = Student
     template_name = "attendance/student_list.html"
     context_object_name = "students"
+    page_cache_models = (STUDENT,)
+
+    def get_queryset(self):
+        # Only evaluated when the template's fragment cache misses
+        return Student.objects.select_related("user")
 
 class StudentCreateView(CreateView):
     model = Student
@@ -300,13 +616,38 @@ class StudentCreateView(CreateView):
         student.user = user
         student.save()
 
-        print("✅ Student and user saved successfully")
+        logger.info("✅ Student %s and user saved", student.matric_no)
         return super().form_valid(form)
 
     def form_invalid(self, form):
-        print("❌ Form errors:", form.errors)
+        logger.debug("❌ Student form errors: %s", form.errors.as_json())
         return super().form_invalid(form)
     
+@method_decorator([login_required, user_passes_test(staff_or_admin)], name='dispatch')
+class StudentImportView(FormView):
+    form_class = StudentImportForm
+    template_name = "attendance/student_import.html"
+    success_url = reverse_lazy("attendance:student_list")
+
+    def form_valid(self, form):
+        roster = form.cleaned_data["roster"]
+        try:
+            result = import_students(read_roster(roster, roster.name))
+        except ValueError as e:
+            form.add_error("roster", str(e))
+            return self.form_invalid(form)
+
+        messages.success(
+            self.request,
+            f"✅ Imported {result.created} students ({result.rows_per_second:.0f} rows/s).",
+        )
+        for error in result.errors[:20]:
+            messages.warning(self.request, error)
+        if len(result.errors) > 20:
+            messages.warning(self.request, f"…and {len(result.errors) - 20} more skipped rows.")
+        return super().form_valid(form)
+
+
 class StudentUpdateView(UpdateView):
     model = Student
     fields = ["user", "matric_no", "department"]
@@ -320,8 +661,31 @@ class StudentDeleteView(DeleteView):
 
 
 # Reports
+@method_decorator([login_required, user_passes_test(staff_or_admin)], name='dispatch')
 class ReportView(TemplateView):
     template_name = "attendance/reports.html"
+    paginate_by = 50
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        form = DateRangeForm(self.request.GET or None)
+        ctx['form'] = form
+
+        if form.is_valid():
+            start, end = form.cleaned_data['start_date'], form.cleaned_data['end_date']
+            days = reports.session_days(start, end)
+
+            paginator = Paginator(reports.student_attendance(start, end, days), self.paginate_by)
+            paginator.count = Student.objects.count()  # one row per student; skip re-running the aggregate
+            page_obj = paginator.get_page(self.request.GET.get('page'))
+
+            ctx['start'], ctx['end'] = start, end
+            ctx['session_days'] = days
+            ctx['page_obj'] = page_obj
+            ctx['students'] = page_obj.object_list
+            ctx['locations'] = reports.location_usage(start, end)
+            ctx['trend'] = reports.daily_trend(start, end)
+        return ctx
 
 class LocationListView(ListView):
     model = Location
@@ -336,27 +700,63 @@ class LocationUpdateView(UpdateView):
     success_url = reverse_lazy('attendance:location_list')
 
 
-class AdminRecordsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class AdminRecordsView(LoginRequiredMixin, UserPassesTestMixin, PageCacheMixin, KeysetPaginationMixin, ListView):
     model = AttendanceRecord
     template_name = "attendance/admin_records.html"
     context_object_name = "records"
+    paginate_by = 50
+    page_cache_models = (STUDENT, RECORD)
+
+    def paginate_queryset(self, queryset, page_size):
+        # The page (rows with their students) is cached per filter/cursor until a student or record changes
+        page = cached("admin_records", [self.page_stamp, self.request.GET.urlencode()],
+                      lambda: super(AdminRecordsView, self).paginate_queryset(queryset, page_size)[1])
+        return None, page, page.object_list, page.has_other_pages()
 
     def test_func(self):
         return self.request.user.is_staff or self.request.user.is_superuser
 
     def get_queryset(self):
-        queryset = AttendanceRecord.objects.select_related("student__user").order_by("-date")
         request = self.request
         matric_no = request.GET.get("matric_no")
         start_date = request.GET.get("start_date")
         end_date = request.GET.get("end_date")
 
+        # Without a date range, closed (archived) semesters are only read when asked (?archived=1)
+        archived = request.GET.get("archived") == "1"
         if matric_no:
-            queryset = queryset.filter(student__matric_no__icontains=matric_no)
+            queryset = record_queryset(archived=archived).filter(student__in=search_students(matric_no))
         elif start_date and end_date:
-            queryset = queryset.filter(date__range=[start_date, end_date])
+            queryset = record_queryset(start_date, end_date)
+        else:
+            queryset = record_queryset(archived=archived)
+
+        return queryset.select_related("student__user").order_by("-date")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["archived_before"] = archived_before()
+        return ctx
+
+
+@login_required
+@user_passes_test(staff_or_admin)
+def student_search(request):
+    """Typeahead: top matches for ?q= on matric number or name, as JSON."""
+    try:
+        limit = min(int(request.GET.get("limit", TYPEAHEAD_LIMIT)), TYPEAHEAD_MAX_LIMIT)
+    except ValueError:
+        limit = TYPEAHEAD_LIMIT
+    return JsonResponse({"results": typeahead(request.GET.get("q", ""), max(limit, 1))})
+
+
+@login_required
+@user_passes_test(staff_or_admin)
+def metrics(request):
+    """This worker's per-view latency / SQL / size totals in Prometheus text format."""
+    body = registry.render(settings.INSTRUMENTATION_SAMPLE_RATE)
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
 
-        return queryset
 
 @login_required
 def register_fingerprint_page(request):
@@ -364,13 +764,6 @@ def register_fingerprint_page(request):
     student = get_object_or_404(Student, user=request.user)
     return render(request, "attendance/register_fingerprint.html", {"student": student})
 
-def b64url_encode(b: bytes) -> str:
-    return base64.urlsafe_b64encode(b).rstrip(b'=').decode('ascii')
-
-def b64url_decode(s: str) -> bytes:
-    padding = '=' * ((4 - len(s) % 4) % 4)
-    return base64.urlsafe_b64decode(s + padding)
-
 @login_required
 def webauthn_register_begin(request):
     if request.method != "POST":
@@ -378,9 +771,9 @@ def webauthn_register_begin(request):
 
     student = Student.objects.get(user=request.user)
 
-    # 1) Create a random challenge and save in session (must match verification later)
+    # 1) Create a random challenge and keep it in the challenge store (must match verification later)
     challenge = os.urandom(32)
-    request.session['webauthn_registration_challenge'] = b64url_encode(challenge)
+    get_challenge_store().put(REGISTER, request.user.pk, b64url_encode(challenge))
 
     # 2) Build publicKey options object (we return JSON that the front-end will consume)
     publicKey = {
@@ -397,8 +790,11 @@ def webauthn_register_begin(request):
             {"type": "public-key", "alg": -257} # RS256 (optional)
         ],
         "timeout": 60000,
-        # You can include excludeCredentials here to prevent re-registering same authenticator
-        # "excludeCredentials": [...]
+        # Authenticators the student already registered refuse to register again
+        "excludeCredentials": [
+            {"type": "public-key", "id": b64url_encode(bytes(credential_id))}
+            for credential_id in student.credentials.values_list("credential_id", flat=True)
+        ],
         # "authenticatorSelection": {"authenticatorAttachment":"platform", "userVerification":"required"}
     }
 
@@ -416,7 +812,7 @@ def webauthn_register_complete(request):
     # You must verify attestation using a WebAuthn library (example pseudo):
     #   verification = verify_registration_response(
     #       credential=body,
-    #       expected_challenge=request.session.get('webauthn_registration_challenge'),
+    #       expected_challenge=expected_challenge,
     #       expected_rp_id=settings.RP_ID,
     #       expected_origin=settings.ORIGIN,
     #       require_user_verification=True,
@@ -426,6 +822,11 @@ def webauthn_register_complete(request):
     #
     # Below is a *placeholder* flow (you must use a real verify_* call from your webauthn library).
 
+    # Single use: a second complete() for the same begin() finds nothing
+    expected_challenge = get_challenge_store().pop(REGISTER, request.user.pk)
+    if expected_challenge is None:
+        return JsonResponse({"success": False, "error": "Registration challenge expired. Try again."}, status=400)
+
     try:
         # Example using a library (pseudo)
         # verification = your_webauthn_lib.verify_attestation(body, expected_challenge, ...)
@@ -438,44 +839,92 @@ def webauthn_register_complete(request):
         public_key_bytes = b'PLACEHOLDER_PUBLIC_KEY'  # replace with real key from verification
         sign_count = 0
 
-        # Save on Student model fields (Student has BinaryFields we discussed earlier)
+        # One more credential for the student; an ID already registered (to anyone) is refused
         student = Student.objects.get(user=request.user)
-        student.webauthn_credential_id = credential_id_bytes
-        student.webauthn_public_key = public_key_bytes
-        student.webauthn_sign_count = sign_count
-        student.save()
+        with transaction.atomic():
+            WebAuthnCredential.objects.create(
+                student=student, credential_id=credential_id_bytes, public_key=public_key_bytes,
+                sign_count=sign_count,
+            )
 
         return JsonResponse({"success": True})
+    except IntegrityError:
+        return JsonResponse({"success": False, "error": "This authenticator is already registered."}, status=400)
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=400)
     
-@login_required
 def webauthn_authenticate_begin(request):
-    student = Student.objects.get(user=request.user)
-    challenge = os.urandom(32)
-    request.session['webauthn_auth_challenge'] = b64url_encode(challenge)
+    """
+    Challenge for navigator.credentials.get(). Signed-in students may use any of
+    their credentials; anonymous visitors get an empty allowCredentials, so the
+    browser offers its discoverable credentials (usernameless login).
+    ?purpose=verify issues the challenge webauthn_authenticate_complete checks,
+    so it never consumes the one a pending check-in needs. POST only; anonymous
+    clients are rate-limited.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    if not request.user.is_authenticated and not login_challenge_allowed(request.META.get("REMOTE_ADDR", "")):
+        return JsonResponse({"error": "Too many login attempts; wait a minute and try again."}, status=429)
+    challenge = b64url_encode(os.urandom(32))
+    if request.user.is_authenticated:
+        # check_in / check_in_async pop AUTHENTICATE, webauthn_authenticate_complete pops VERIFY
+        purpose = VERIFY if request.GET.get("purpose") == VERIFY else AUTHENTICATE
+        get_challenge_store().put(purpose, request.user.pk, challenge)
+        credential_ids = WebAuthnCredential.objects.filter(student__user=request.user).values_list(
+            "credential_id", flat=True
+        )
+        allow = [{"type": "public-key", "id": b64url_encode(bytes(c))} for c in credential_ids]
+    else:
+        # No user yet: the challenge is its own key, found again from the signed clientDataJSON
+        get_challenge_store().put(LOGIN, challenge, challenge)
+        allow = []
 
     publicKey = {
-        "challenge": b64url_encode(challenge),
+        "challenge": challenge,
         "timeout": 60000,
         "rpId": settings.RP_ID if hasattr(settings, "RP_ID") else request.get_host(),
-        "allowCredentials": [
-            {"type": "public-key", "id": b64url_encode(student.webauthn_credential_id)}
-        ],
+        "allowCredentials": allow,
         "userVerification": "required"
     }
     return JsonResponse({"publicKey": publicKey})
 
-@login_required
+
 def webauthn_authenticate_complete(request):
-    body = json.loads(request.body)
-    # Here you would verify the assertion using a WebAuthn library
-    # verify_authentication_response(...)
+    """
+    Verify an assertion against the credential it names (one indexed lookup). A
+    signed-in student must own the credential; an anonymous visitor is logged in
+    as its owner.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
     try:
-        # pseudo verification
-        student = Student.objects.get(user=request.user)
-        student.webauthn_sign_count += 1
-        student.save()
-        return JsonResponse({"success": True})
+        body = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Invalid JSON."}, status=400)
+
+    credential = find_credential(body)
+    if credential is None or (credential.student.user_id != request.user.pk if request.user.is_authenticated
+                              else not credential.student.user.is_active):
+        return JsonResponse({"success": False, "error": "Unknown credential."}, status=400)
+
+    store = get_challenge_store()
+    if request.user.is_authenticated:
+        challenge = store.pop(VERIFY, request.user.pk)
+    else:
+        signed = assertion_challenge(body)
+        challenge = store.pop(LOGIN, signed) if signed else None
+    if challenge is None:
+        return JsonResponse({"success": False, "error": "Challenge expired. Try again."}, status=400)
+
+    try:
+        verification = _verify_fingerprint(credential, body, challenge)
     except Exception as e:
+        logger.warning("⚠️ Fingerprint verification failed for %s: %s", credential.student.matric_no, e)
         return JsonResponse({"success": False, "error": str(e)}, status=400)
+
+    credential.sign_count = verification.new_sign_count
+    credential.save(update_fields=["sign_count"])
+    if not request.user.is_authenticated:
+        login(request, credential.student.user)
+    return JsonResponse({"success": True})
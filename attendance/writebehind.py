@@ -0,0 +1,275 @@
+import datetime
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import AttendanceRecord
+from .pagecache import RECORD, touch
+from .stats import record_check_ins, record_late_check_in
+from .summary import bump_daily_summary
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 30  # a claimed batch not acknowledged within this is handed out again
+
+
+class LeaseLost(Exception):
+    """The batch was handed to another flusher while this one was still writing it."""
+
+
+class CheckInQueue:
+    """
+    Durable local queue of validated check-ins, kept in its own SQLite file in
+    WAL mode so enqueueing never waits on the main database's write lock.
+
+    Rows are unique per (student, date), which makes enqueueing idempotent.
+    Flushers claim a batch with a lease and delete it only after the records
+    are committed; if a flusher dies, its lease expires and the batch is
+    redelivered. A flusher renews its lease just before committing and rolls
+    back if the batch has been re-claimed meanwhile, so only one commits it.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pending_check_in (
+                    id INTEGER PRIMARY KEY,
+                    student_id INTEGER NOT NULL,
+                    date TEXT NOT NULL,
+                    check_in TEXT NOT NULL,
+                    location_id INTEGER,
+                    latitude TEXT,
+                    longitude TEXT,
+                    department TEXT NOT NULL DEFAULT '',
+                    claimed_by TEXT,
+                    claimed_at REAL,
+                    UNIQUE (student_id, date)
+                )
+            """)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, student_id, date, check_in, location_id, latitude, longitude, department=""):
+        """Queue a check-in. Returns False if this student already has one queued for the date."""
+        cursor = self._connect().execute(
+            "INSERT OR IGNORE INTO pending_check_in "
+            "(student_id, date, check_in, location_id, latitude, longitude, department) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (student_id, date.isoformat(), check_in.isoformat(), location_id,
+             str(latitude), str(longitude), department or ""),
+        )
+        return cursor.rowcount == 1
+
+    def claim(self, limit):
+        """Lease up to `limit` unclaimed (or expired) rows. Returns (token, rows)."""
+        token, now = uuid.uuid4().hex, time.time()
+        conn = self._connect()
+        conn.execute(
+            "UPDATE pending_check_in SET claimed_by = ?, claimed_at = ? WHERE id IN ("
+            "  SELECT id FROM pending_check_in WHERE claimed_at IS NULL OR claimed_at < ?"
+            "  ORDER BY id LIMIT ?)",
+            (token, now, now - LEASE_SECONDS, limit),
+        )
+        rows = conn.execute(
+            "SELECT id, student_id, date, check_in, location_id, latitude, longitude, department "
+            "FROM pending_check_in WHERE claimed_by = ? ORDER BY id",
+            (token,),
+        ).fetchall()
+        return token, rows
+
+    def renew(self, token, count):
+        """Extend the lease on a claimed batch. Returns False if any of its `count` rows was re-claimed."""
+        cursor = self._connect().execute(
+            "UPDATE pending_check_in SET claimed_at = ? WHERE claimed_by = ?", (time.time(), token)
+        )
+        return cursor.rowcount == count
+
+    def ack(self, token):
+        """Delete a claimed batch once its records are committed."""
+        self._connect().execute("DELETE FROM pending_check_in WHERE claimed_by = ?", (token,))
+
+    def release(self, token):
+        """Hand a claimed batch back after a failed flush."""
+        self._connect().execute(
+            "UPDATE pending_check_in SET claimed_by = NULL, claimed_at = NULL WHERE claimed_by = ?", (token,)
+        )
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM pending_check_in").fetchone()[0]
+
+
+def flush_check_ins(queue, batch_size=500):
+    """
+    Move one claimed batch from the queue into AttendanceRecord. Returns the
+    number of queued check-ins processed (0 when the queue is empty).
+
+    Safe to re-run on the same rows: students who already have a checked-in
+    record for the day are skipped, and the insert ignores (student, date)
+    conflicts, so a redelivered batch never duplicates records or counts. A
+    flush that outlives its lease is rolled back rather than committed next to
+    the flusher that re-claimed the batch.
+    """
+    token, rows = queue.claim(batch_size)
+    if not rows:
+        return 0
+
+    try:
+        with transaction.atomic():
+            _write_batch(rows)
+            if not queue.renew(token, len(rows)):
+                raise LeaseLost
+    except LeaseLost:
+        logger.warning("⚠️ Check-in batch outlived its %ss lease and was re-claimed; rolled back", LEASE_SECONDS)
+        return 0
+    except Exception:
+        queue.release(token)
+        raise
+
+    queue.ack(token)
+    return len(rows)
+
+
+def _write_batch(rows):
+    write_check_ins({
+        (student_id, datetime.date.fromisoformat(date)): {
+            "check_in": datetime.time.fromisoformat(check_in),
+            "location_id": location_id,
+            "latitude": Decimal(latitude) if latitude else None,
+            "longitude": Decimal(longitude) if longitude else None,
+            "department": department,
+        }
+        for _, student_id, date, check_in, location_id, latitude, longitude, department in rows
+    })
+
+
+CREATED, CHECKED_IN, ALREADY_CHECKED_IN = "created", "checked_in", "already_checked_in"
+
+
+def write_check_ins(pending):
+    """
+    Write validated check-ins in bulk: {(student_id, date): {"check_in" (UTC time),
+    "location_id", "latitude", "longitude", "department"}}. Call inside a
+    transaction. Returns {(student_id, date): outcome}: CREATED for a new record,
+    CHECKED_IN for an Absent record turned into a check-in, ALREADY_CHECKED_IN
+    when the student had checked in that day (possibly concurrently).
+    """
+    existing = {
+        (record.student_id, record.date): record
+        for record in AttendanceRecord.objects.filter(
+            student_id__in={key[0] for key in pending},
+            date__in={key[1] for key in pending},
+        )
+    }
+
+    outcomes, new_records, late = {}, [], []
+    for key, item in pending.items():
+        record = existing.get(key)
+        if record is None:
+            new_records.append(AttendanceRecord(
+                student_id=key[0], date=key[1], status="Present", check_in=item["check_in"],
+                location_id=item["location_id"], latitude=item["latitude"], longitude=item["longitude"],
+            ))
+        elif record.check_in:
+            outcomes[key] = ALREADY_CHECKED_IN
+        else:
+            # Absent row written by the end-of-day job → turn it into a check-in
+            late.append((record, record.status == "Absent", record.location_id))
+            record.status = "Present"
+            record.check_in = item["check_in"]
+            record.location_id = item["location_id"]
+            record.latitude, record.longitude = item["latitude"], item["longitude"]
+            outcomes[key] = CHECKED_IN
+
+    if new_records:
+        AttendanceRecord.objects.bulk_create(new_records, ignore_conflicts=True)
+        # Rows skipped as conflicts belong to check-ins that committed after the read above
+        stored = dict(
+            ((student_id, date), check_in) for student_id, date, check_in in AttendanceRecord.objects.filter(
+                student_id__in={r.student_id for r in new_records}, date__in={r.date for r in new_records},
+            ).values_list("student_id", "date", "check_in")
+        )
+        for record in new_records:
+            key = (record.student_id, record.date)
+            outcomes[key] = CREATED if stored.get(key) == record.check_in else ALREADY_CHECKED_IN
+    if late:
+        AttendanceRecord.objects.bulk_update(
+            [record for record, _, _ in late], ["status", "check_in", "location_id", "latitude", "longitude"],
+        )
+    touch(RECORD)
+
+    summary, first_check_ins = Counter(), {}
+    for record, was_absent, old_location_id in late:
+        department = pending[(record.student_id, record.date)]["department"]
+        if was_absent:
+            summary[(record.date, old_location_id, department, "absent")] -= 1
+        summary[(record.date, record.location_id, department, "present")] += 1
+        checked_in_at = datetime.datetime.combine(record.date, record.check_in, tzinfo=datetime.timezone.utc)
+        record_late_check_in(record.student_id, record.date, checked_in_at, was_absent)
+    for record in new_records:
+        if outcomes[(record.student_id, record.date)] != CREATED:
+            continue
+        summary[(record.date, record.location_id, pending[(record.student_id, record.date)]["department"],
+                 "present")] += 1
+        checked_in_at = datetime.datetime.combine(record.date, record.check_in, tzinfo=datetime.timezone.utc)
+        first_check_ins.setdefault(record.date, {})[record.student_id] = checked_in_at
+
+    for (date, location_id, department, field), delta in summary.items():
+        bump_daily_summary(date, location_id, department, **{field: delta})
+    # Student counters: one UPDATE per day, plus one bulk_update for the check-in times
+    for date, check_ins in first_check_ins.items():
+        record_check_ins(check_ins, date)
+    return outcomes
+
+
+# ---------------- PER-PROCESS QUEUE + FLUSHER ----------------
+_queue = None
+_flusher = None
+_lock = threading.Lock()
+
+
+class CheckInFlusher(threading.Thread):
+    """Daemon thread that drains the queue every CHECK_IN_FLUSH_INTERVAL_MS."""
+
+    def __init__(self, queue, interval):
+        super().__init__(name="check-in-flusher", daemon=True)
+        self.queue = queue
+        self.interval = interval
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                while flush_check_ins(self.queue):
+                    pass
+            except Exception:
+                logger.exception("⚠️ Check-in flush failed, will retry")
+            finally:
+                close_old_connections()
+
+
+def get_check_in_queue():
+    """Return this process's queue, starting its background flusher on first use."""
+    global _queue, _flusher
+    if _queue is None:
+        with _lock:
+            if _queue is None:
+                _queue = CheckInQueue(settings.CHECK_IN_QUEUE_PATH)
+                _flusher = CheckInFlusher(_queue, settings.CHECK_IN_FLUSH_INTERVAL_MS / 1000)
+                _flusher.start()
+    return _queue
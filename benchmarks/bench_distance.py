@@ -0,0 +1,62 @@
+"""
+Compare the scalar calculate_distance loop with the batch calculate_distances.
+
+Usage:
+    python benchmarks/bench_distance.py [--sizes 10000 1000000 10000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance import utils  # noqa: E402
+
+# Around the seeded campus locations (see 0002_add_initial_locations)
+BASE_LAT, BASE_LON = 7.3775, 3.9470
+
+
+def make_points(n):
+    rng = random.Random(42)
+    lats = [BASE_LAT + rng.uniform(-0.01, 0.01) for _ in range(n)]
+    lons = [BASE_LON + rng.uniform(-0.01, 0.01) for _ in range(n)]
+    return lats, lons
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def scalar_loop(lats, lons, lat2, lon2):
+    return [utils.calculate_distance(a, b, lat2, lon2) for a, b in zip(lats, lons)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"NumPy: {'yes (' + utils.np.__version__ + ')' if utils.np is not None else 'not installed'}")
+    print(f"{'points':>12} {'scalar (s)':>12} {'python batch (s)':>17} {'numpy batch (s)':>16} {'speedup':>8}")
+
+    for n in args.sizes:
+        lats, lons = make_points(n)
+
+        scalar = timed(scalar_loop, lats, lons, BASE_LAT, BASE_LON)
+        python = timed(utils._calculate_distances_python, lats, lons, BASE_LAT, BASE_LON)
+
+        if utils.np is not None:
+            # Time the vectorised math only, not the list → array conversion
+            lat_arr, lon_arr = utils.np.asarray(lats), utils.np.asarray(lons)
+            vector = timed(utils._calculate_distances_numpy, lat_arr, lon_arr, BASE_LAT, BASE_LON)
+            print(f"{n:>12} {scalar:>12.3f} {python:>17.3f} {vector:>16.3f} {scalar / vector:>7.1f}x")
+        else:
+            print(f"{n:>12} {scalar:>12.3f} {python:>17.3f} {'—':>16} {'—':>8}")
+
+
+if __name__ == "__main__":
+    main()
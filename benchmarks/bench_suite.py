@@ -0,0 +1,228 @@
+"""
+Time the hot views and utilities at several data sizes and record query counts.
+
+Each size (STUDENTSxDAYS) is seeded with seed_synthetic into a throw-away test
+database on whatever backend the settings point at (set DATABASE_URL for
+PostgreSQL). Results are written as JSON so runs can be compared between commits.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 200x10 1000x30 5000x30] [--runs 5]
+                                     [--output results.json] [--compare previous.json]
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Attendance_Tracker.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection, reset_queries  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from attendance import utils  # noqa: E402
+from attendance.catalogue import get_geofence_index, invalidate_location_catalogue  # noqa: E402
+from attendance.challenges import AUTHENTICATE, get_challenge_store  # noqa: E402
+from attendance.models import Student  # noqa: E402
+from attendance.synthetic import CAMPUS, clear_synthetic, placeholder_assertion, seed_synthetic  # noqa: E402
+
+
+def parse_size(text):
+    students, _, days = text.lower().partition("x")
+    return int(students), int(days)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func, runs, setup=None):
+    """Run func `runs` times (after an untimed setup()); returns timings (ms) and the last run's query count."""
+    timings = []
+    for _ in range(runs):
+        if setup is not None:
+            setup()
+        reset_queries()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "queries": len(ctx),
+    }
+
+
+def consume(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request['PATH_INFO']} returned {response.status_code}")
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def cases(n_students, n_days, runs):
+    """(name, callable, setup) triples for one seeded size."""
+    today = timezone.localdate()
+    first_day = today - datetime.timedelta(days=n_days)
+    date_range = {"start_date": first_day, "end_date": today}
+
+    admin = Client()
+    admin.force_login(User.objects.get(username="bench-admin"))
+
+    students = list(Student.objects.select_related("user").order_by("id")[:runs])
+    student_client = Client()
+    student_client.force_login(students[0].user)
+
+    # Each check-in run uses the next student, so every run takes the "first check-in today" path
+    check_in_students = iter(students)
+    check_in_client = Client()
+    lat, lon = CAMPUS[0]
+
+    assertion = [None]
+
+    def log_in_next_student():
+        user = next(check_in_students).user
+        check_in_client.force_login(user)
+        get_challenge_store().put(AUTHENTICATE, user.pk, "bench")
+        assertion[0] = placeholder_assertion(user.username)
+
+    def check_in():
+        consume(check_in_client.post(reverse("attendance:check_in"),
+                                     {"latitude": lat, "longitude": lon, "assertion": assertion[0]}))
+
+    rng = random.Random(7)
+    points = [(lat + rng.uniform(-0.01, 0.01), lon + rng.uniform(-0.01, 0.01)) for _ in range(n_students)]
+
+    def distance_loop():
+        for p_lat, p_lon in points:
+            utils.calculate_distance(p_lat, p_lon, lat, lon)
+
+    def distance_batch():
+        utils.calculate_distances([p[0] for p in points], [p[1] for p in points], lat, lon)
+
+    def geofence_match():
+        index = get_geofence_index()
+        for p_lat, p_lon in points:
+            index.match(p_lat, p_lon)
+
+    return [
+        ("check_in", check_in, log_in_next_student),
+        ("admin_dashboard", lambda: consume(admin.get(reverse("attendance:admin_dashboard"))), None),
+        ("all_records", lambda: consume(admin.get(reverse("attendance:all_records"), date_range)), None),
+        ("admin_records_search", lambda: consume(admin.get(reverse("attendance:admin_records"),
+                                                           {"matric_no": "SYN00001"})), None),
+        ("my_records", lambda: consume(student_client.get(reverse("attendance:my_records"))), None),
+        ("reports", lambda: consume(admin.get(reverse("attendance:reports"), date_range)), None),
+        ("export_csv", lambda: consume(admin.get(reverse("attendance:export_csv"), date_range)), None),
+        (f"calculate_distance x{n_students}", distance_loop, None),
+        (f"calculate_distances x{n_students}", distance_batch, None),
+        (f"geofence_match x{n_students}", geofence_match, None),
+    ]
+
+
+def compare(results, previous_path):
+    with open(previous_path) as f:
+        previous = {(r["size"], r["name"]): r for r in json.load(f)["results"]}
+
+    print(f"\nCompared with {previous_path}:")
+    print(f"{'size':>10} {'case':<32} {'before ms':>10} {'after ms':>10} {'change':>8} {'queries':>9}")
+    for r in results:
+        before = previous.get((r["size"], r["name"]))
+        if before is None:
+            continue
+        change = (r["median_ms"] / before["median_ms"] - 1) * 100 if before["median_ms"] else 0
+        print(f"{r['size']:>10} {r['name']:<32} {before['median_ms']:>10.1f} {r['median_ms']:>10.1f} "
+              f"{change:>+7.0f}% {before['queries']:>4}→{r['queries']:<4}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["200x10", "1000x30", "5000x30"],
+                        help="STUDENTSxDAYS per size")
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    # Keep the per-request instrumentation lines out of the report
+    logging.getLogger("attendance").setLevel(logging.WARNING)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    results = []
+    try:
+        User.objects.create_user(username="bench-admin", password="!", is_staff=True)
+        print(f"{'size':>10} {'case':<32} {'median ms':>10} {'min ms':>9} {'queries':>8}")
+
+        for size in args.sizes:
+            n_students, n_days = parse_size(size)
+            clear_synthetic()
+            seeded = seed_synthetic(n_students, args.locations, n_days)
+            invalidate_location_catalogue()
+            print(f"{size:>10} seeded {seeded.records} records in {seeded.elapsed:.1f}s")
+
+            with mock.patch("attendance.views._verify_fingerprint",
+                            return_value=SimpleNamespace(new_sign_count=1)):
+                for name, func, setup in cases(n_students, n_days, args.runs):
+                    stats = measure(func, args.runs, setup)
+                    results.append({"size": size, "students": n_students, "days": n_days,
+                                    "records": seeded.records, "name": name, **stats})
+                    print(f"{size:>10} {name:<32} {stats['median_ms']:>10.1f} {stats['min_ms']:>9.1f} "
+                          f"{stats['queries']:>8}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"{commit or 'unknown'}-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "commit": commit,
+                "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "numpy": utils.np.__version__ if utils.np is not None else None,
+                "runs": args.runs,
+                "locations": args.locations,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Load-test check-in: gunicorn + sync views (WSGI) vs uvicorn + async views (ASGI).
+
+Seeds a throw-away database with students and logged-in sessions, then for
+each server hammers POST /attendance/check-in/ from concurrent clients and
+reports requests per second and p50/p99 latency.
+
+Usage:
+    python benchmarks/load_check_in.py [--students 2000] [--concurrency 50] [--duration 20] [--workers 4]
+
+Set LOADTEST_DATABASE_URL to run against a disposable PostgreSQL database
+instead of a temporary SQLite file. Needs gunicorn and uvicorn installed.
+"""
+import argparse
+import atexit
+import http.client
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TMP_DIR = tempfile.mkdtemp(prefix="attendance-loadtest-")
+atexit.register(shutil.rmtree, TMP_DIR, True)
+os.environ.setdefault("LOADTEST_DB", os.path.join(TMP_DIR, "loadtest.sqlite3"))
+os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.loadtest_settings"
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.contrib.sessions.backends.db import SessionStore  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from attendance.models import AttendanceRecord, DailyAttendanceSummary, Student, WebAuthnCredential  # noqa: E402
+from attendance.synthetic import placeholder_assertion, placeholder_credential  # noqa: E402
+
+SERVERS = {
+    "wsgi": (["gunicorn", "benchmarks.loadtest_app:wsgi", "--workers", "{workers}", "--bind", "127.0.0.1:{port}"],
+             {"ASYNC_CHECK_IN": "0"}),
+    "asgi": (["uvicorn", "benchmarks.loadtest_app:asgi", "--workers", "{workers}", "--port", "{port}",
+              "--log-level", "warning"],
+             {"ASYNC_CHECK_IN": "1"}),
+}
+
+
+def seed(n_students):
+    """Students with placeholder credentials and sessions; returns one (session key, check-in body) per student."""
+    call_command("migrate", verbosity=0)
+    User.objects.bulk_create([User(username=f"LOAD{i:06}", password="!") for i in range(n_students)])
+    users = list(User.objects.filter(username__startswith="LOAD"))
+    Student.objects.bulk_create([Student(user=u, matric_no=u.username, department="Load") for u in users])
+    student_ids = dict(Student.objects.filter(matric_no__startswith="LOAD").values_list("matric_no", "id"))
+    WebAuthnCredential.objects.bulk_create([placeholder_credential(student_ids[u.username], u.username) for u in users])
+
+    clients = []
+    for user in users:
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        assertion = placeholder_assertion(user.username)
+        body = urlencode({"latitude": "7.3776", "longitude": "3.9471", "assertion": assertion})
+        clients.append((session.session_key, body))
+    return clients
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+def run_load(port, clients, concurrency, duration):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    counter = iter(range(10**9))
+    deadline = time.perf_counter() + duration
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while time.perf_counter() < deadline:
+            key, body = clients[next(counter) % len(clients)]
+            headers = {"Content-Type": "application/x-www-form-urlencoded",
+                       "Cookie": f"{settings.SESSION_COOKIE_NAME}={key}"}
+            start = time.perf_counter()
+            try:
+                conn.request("POST", "/attendance/check-in/", body, headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 302
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                (latencies if ok else errors).append(elapsed)
+        conn.close()
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--servers", nargs="+", choices=list(SERVERS), default=list(SERVERS))
+    args = parser.parse_args()
+
+    clients = seed(args.students)
+    connection.close()
+    print(f"Seeded {len(clients)} students on {connection.vendor}; "
+          f"{args.concurrency} clients for {args.duration:.0f}s, {args.workers} workers each")
+    print(f"{'server':>6} {'requests':>9} {'errors':>7} {'records':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+
+    for name in args.servers:
+        AttendanceRecord.objects.all().delete()
+        DailyAttendanceSummary.objects.all().delete()
+        connection.close()
+
+        command, extra_env = SERVERS[name]
+        port = free_port()
+        command = [part.format(workers=args.workers, port=port) for part in command]
+        server = subprocess.Popen(command, cwd=ROOT, env={**os.environ, **extra_env},
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            latencies, errors = run_load(port, clients, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+        # Every request redirects, so count rows to confirm check-ins really happened
+        records = AttendanceRecord.objects.count()
+        connection.close()
+
+        if not latencies:
+            print(f"{name:>6} {0:>9} {len(errors):>7}  (no successful requests)")
+            continue
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:>6} {len(latencies):>9} {len(errors):>7} {records:>8} {len(latencies) / args.duration:>8.1f} "
+              f"{statistics.median(latencies) * 1000:>8.1f} {p99 * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
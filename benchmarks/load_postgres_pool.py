@@ -0,0 +1,167 @@
+"""
+Load-test PostgreSQL connection handling: persistent connections vs psycopg_pool.
+
+Starts a disposable PostgreSQL server (pgserver if installed, else initdb/pg_ctl
+from PATH) in a temporary directory, seeds it like load_check_in.py, then runs
+gunicorn with threaded workers once per mode:
+
+    persistent  DB_POOL=0: one connection per worker thread, kept for CONN_MAX_AGE
+    pooled      DB_POOL=1: each worker lends out at most DB_POOL_MAX_SIZE connections
+
+and reports req/s, p50/p99 latency, errors and the peak number of server
+connections. Afterwards every app connection is killed server-side (as a
+failover or idle timeout would) and the errors of the next burst are counted.
+
+Usage:
+    python benchmarks/load_postgres_pool.py [--workers 4] [--threads 32] [--concurrency 128] [--pool-max-size 10]
+
+Set LOADTEST_DATABASE_URL to use an existing throw-away database instead.
+
+Example (500 students, 10 s, max_connections=100, 4 workers x 32 threads):
+
+          mode  requests  errors    req/s   p50 ms   p99 ms peak conns  killed errors after kill
+    persistent       166     244     16.6  10193.1  12681.7         99      99                11
+        pooled       310       0     31.0   4948.4  11286.5         25      25                 0
+
+Persistent connections need one per thread (128 > 100), so requests fail with
+"too many clients"; the pool stays at 4 x 10 and queues requests for a connection instead.
+"""
+import argparse
+import atexit
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = {"persistent": {"DB_POOL": "0"}, "pooled": {"DB_POOL": "1"}}
+BACKENDS_SQL = ("SELECT pid FROM pg_stat_activity WHERE datname = current_database() "
+                "AND backend_type = 'client backend' AND pid <> pg_backend_pid()")
+
+
+def disposable_postgres():
+    """Start a throw-away server and return its URL; it is stopped and deleted at exit."""
+    data = tempfile.mkdtemp(prefix="attendance-pg-")
+    try:
+        import pgserver
+    except ImportError:
+        pgserver = None
+    if pgserver is not None:
+        server = pgserver.get_server(data, cleanup_mode="delete")
+        atexit.register(server.cleanup)
+        return server.get_uri()
+
+    if not shutil.which("initdb") or not shutil.which("pg_ctl"):
+        raise SystemExit("Need pgserver (pip install pgserver) or initdb/pg_ctl on PATH, "
+                         "or set LOADTEST_DATABASE_URL.")
+    atexit.register(shutil.rmtree, data, True)
+    subprocess.run(["initdb", "-D", data, "-U", "postgres", "--auth=trust"], check=True, stdout=subprocess.DEVNULL)
+    subprocess.run(["pg_ctl", "-D", data, "-w", "-l", os.path.join(data, "server.log"),
+                    "-o", f"-c listen_addresses='' -k {data}", "start"], check=True, stdout=subprocess.DEVNULL)
+    atexit.register(subprocess.run, ["pg_ctl", "-D", data, "-m", "immediate", "stop"], stdout=subprocess.DEVNULL)
+    return f"postgresql://postgres@{quote(data, safe='')}/postgres"
+
+
+if not os.environ.get("LOADTEST_DATABASE_URL"):
+    os.environ["LOADTEST_DATABASE_URL"] = disposable_postgres()
+os.environ["DB_POOL"] = "0"  # this process only seeds and inspects; the servers get their mode's setting
+
+import psycopg  # noqa: E402
+
+from benchmarks.load_check_in import free_port, run_load, seed, wait_for_port  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from attendance.models import AttendanceRecord, DailyAttendanceSummary, StudentStats  # noqa: E402
+
+
+def admin_connection():
+    return psycopg.connect(os.environ["LOADTEST_DATABASE_URL"], autocommit=True)
+
+
+def sample_backends(stop, peak):
+    with admin_connection() as conn:
+        while not stop.is_set():
+            peak[0] = max(peak[0], len(conn.execute(BACKENDS_SQL).fetchall()))
+            time.sleep(0.1)
+
+
+def kill_backends():
+    with admin_connection() as conn:
+        pids = [pid for (pid,) in conn.execute(BACKENDS_SQL).fetchall()]
+        for pid in pids:
+            conn.execute("SELECT pg_terminate_backend(%s)", [pid])
+    return len(pids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=128)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--pool-min-size", type=int, default=2)
+    parser.add_argument("--pool-max-size", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    clients = seed(args.students)
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW max_connections")
+        max_connections = cursor.fetchone()[0]
+    connection.close()
+    print(f"Seeded {len(clients)} students; server max_connections={max_connections}; "
+          f"{args.concurrency} clients for {args.duration:.0f}s against {args.workers} workers "
+          f"x {args.threads} threads (pool {args.pool_min_size}..{args.pool_max_size} per worker)")
+    print(f"{'mode':>10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'peak conns':>10} {'killed':>7} {'errors after kill':>17}")
+
+    for name in args.modes:
+        AttendanceRecord.objects.all().delete()
+        DailyAttendanceSummary.objects.all().delete()
+        StudentStats.objects.all().delete()
+        connection.close()
+
+        port = free_port()
+        env = {**os.environ, **MODES[name], "ASYNC_CHECK_IN": "0",
+               "DB_POOL_MIN_SIZE": str(args.pool_min_size), "DB_POOL_MAX_SIZE": str(args.pool_max_size)}
+        server = subprocess.Popen(
+            ["gunicorn", "benchmarks.loadtest_app:wsgi", "--workers", str(args.workers),
+             "--worker-class", "gthread", "--threads", str(args.threads), "--bind", f"127.0.0.1:{port}"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        stop, peak = threading.Event(), [0]
+        sampler = threading.Thread(target=sample_backends, args=(stop, peak))
+        try:
+            wait_for_port(port)
+            sampler.start()
+            latencies, errors = run_load(port, clients, args.concurrency, args.duration)
+            stop.set()
+            sampler.join()
+            # Connections dropped under the app's feet: the next requests must not fail
+            killed = kill_backends()
+            _, errors_after_kill = run_load(port, clients, args.concurrency, 2)
+        finally:
+            stop.set()
+            server.terminate()
+            server.wait()
+
+        if not latencies:
+            print(f"{name:>10} {0:>9} {len(errors):>7}  (no successful requests)")
+            continue
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:>10} {len(latencies):>9} {len(errors):>7} {len(latencies) / args.duration:>8.1f} "
+              f"{statistics.median(latencies) * 1000:>8.1f} {p99 * 1000:>8.1f} {peak[0]:>10} "
+              f"{killed:>7} {len(errors_after_kill):>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+WSGI/ASGI entry points for the check-in load test.
+
+WebAuthn verification is swapped for a real ECDSA P-256 signature check over a
+fixed payload, so the CPU cost per request matches production without needing
+a physical authenticator.
+"""
+import os
+from types import SimpleNamespace
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.loadtest_settings")
+
+import django  # noqa: E402
+from cryptography.hazmat.primitives import hashes  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+
+django.setup()
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+
+from attendance import views  # noqa: E402
+from attendance.challenges import AUTHENTICATE, get_challenge_store  # noqa: E402
+
+_KEY = ec.generate_private_key(ec.SECP256R1())
+_PAYLOAD = b"authenticatorData" + b"\x00" * 64 + b"clientDataHash" * 2
+_SIGNATURE = _KEY.sign(_PAYLOAD, ec.ECDSA(hashes.SHA256()))
+
+
+def fake_verify_authentication_response(credential_current_sign_count=0, **kwargs):
+    _KEY.public_key().verify(_SIGNATURE, _PAYLOAD, ec.ECDSA(hashes.SHA256()))
+    return SimpleNamespace(new_sign_count=credential_current_sign_count + 1)
+
+
+views.verify_authentication_response = fake_verify_authentication_response
+
+
+class ChallengeMiddleware:
+    """Issue a WebAuthn challenge for the requesting student before each check-in."""
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        get_challenge_store().put(AUTHENTICATE, request.user.pk, "loadtest")
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        user = await request.auser()
+        await get_challenge_store().aput(AUTHENTICATE, user.pk, "loadtest")
+        return await self.get_response(request)
+
+
+wsgi = get_wsgi_application()
+asgi = get_asgi_application()
@@ -0,0 +1,24 @@
+"""
+Settings for the load-test servers started by benchmarks/load_check_in.py.
+
+Uses a throw-away database (LOADTEST_DATABASE_URL, or a temporary SQLite
+file at LOADTEST_DB) and replaces CSRF with a middleware that issues a fresh
+WebAuthn challenge per request (challenge store, not the session), so every POST runs the full check-in path.
+"""
+import os
+
+from Attendance_Tracker.settings import *  # noqa: F401,F403
+from Attendance_Tracker.settings import MIDDLEWARE, SQLITE_OPTIONS, postgres_database
+
+if os.environ.get("LOADTEST_DATABASE_URL"):
+    # Same pooling (DB_POOL, DB_POOL_*) as production; the disposable server has no TLS
+    DATABASES = {"default": postgres_database(os.environ["LOADTEST_DATABASE_URL"], ssl_require=False)}
+else:
+    DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": os.environ["LOADTEST_DB"],
+                             "OPTIONS": SQLITE_OPTIONS}}
+
+MIDDLEWARE = [
+    m for m in MIDDLEWARE if m != "django.middleware.csrf.CsrfViewMiddleware"
+] + ["benchmarks.loadtest_app.ChallengeMiddleware"]
+
+LOGGING = {"version": 1, "disable_existing_loggers": False, "root": {"level": "WARNING"}}
@@ -0,0 +1,137 @@
+"""
+Concurrent-writer stress test for the SQLite profile (SQLITE_TUNING).
+
+Several processes run check_in's write transaction at once (get_or_create the
+record, bump the daily summary, count the session) against one SQLite file,
+first with Django's defaults (rollback journal, deferred BEGIN) and then with
+the tuned profile (WAL, synchronous=NORMAL, busy_timeout, BEGIN IMMEDIATE).
+Reports committed transactions per second, latency and "database is locked"
+errors for each.
+
+Usage:
+    python benchmarks/sqlite_writers.py [--writers 8] [--ops 200] [--profiles default tuned]
+"""
+import argparse
+import datetime
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _setup_django(db_path, tuned):
+    # Runs in fresh (spawned) processes, so the profile is chosen before settings load
+    os.environ["LOADTEST_DB"] = db_path
+    os.environ["SQLITE_TUNING"] = "1" if tuned else "0"
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.loadtest_settings"
+    import django
+    django.setup()
+
+
+def seed(db_path, tuned, students):
+    _setup_django(db_path, tuned)
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    from attendance.models import Student
+
+    call_command("migrate", verbosity=0)
+    User.objects.bulk_create([User(username=f"W{i:06}", password="!") for i in range(students)])
+    Student.objects.bulk_create([Student(user=u, matric_no=u.username, department="Stress")
+                                 for u in User.objects.filter(username__startswith="W")])
+
+
+def writer(db_path, tuned, worker, ops, barrier, results):
+    _setup_django(db_path, tuned)
+    from django.db import OperationalError, connection, transaction
+    from django.utils import timezone
+
+    from attendance.models import AttendanceRecord, Location, Student
+    from attendance.stats import record_session
+    from attendance.summary import bump_daily_summary
+
+    student_ids = list(Student.objects.order_by("id").values_list("id", flat=True))
+    location_id = Location.objects.values_list("id", flat=True).first()
+    connection.close()  # every writer starts from a fresh connection at the barrier
+    barrier.wait()
+
+    latencies, locked, other = [], 0, 0
+    start = time.perf_counter()
+    for op in range(ops):
+        # Distinct (student, day) per operation, so every transaction really writes
+        student_id = student_ids[(worker * ops + op) % len(student_ids)]
+        day = datetime.date(2024, 1, 1) + datetime.timedelta(days=(worker * ops + op) // len(student_ids))
+        began = time.perf_counter()
+        try:
+            with transaction.atomic():
+                now = timezone.now()
+                _, created = AttendanceRecord.objects.get_or_create(
+                    student_id=student_id, date=day,
+                    defaults={"status": "Present", "check_in": now, "location_id": location_id},
+                )
+                if created:
+                    bump_daily_summary(day, location_id, "Stress", present=1)
+                    record_session(student_id, day, present=True, at=now)
+            latencies.append(time.perf_counter() - began)
+        except OperationalError as exc:
+            if "locked" in str(exc) or "busy" in str(exc):
+                locked += 1
+            else:
+                other += 1
+    results.put({"elapsed": time.perf_counter() - start, "latencies": latencies, "locked": locked, "other": other})
+
+
+def run(profile, writers, ops, students):
+    tuned = profile == "tuned"
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="attendance-sqlite-stress-") as tmp:
+        db_path = os.path.join(tmp, "stress.sqlite3")
+        seeder = ctx.Process(target=seed, args=(db_path, tuned, students))
+        seeder.start()
+        seeder.join()
+
+        barrier, results = ctx.Barrier(writers), ctx.Queue()
+        procs = [ctx.Process(target=writer, args=(db_path, tuned, w, ops, barrier, results)) for w in range(writers)]
+        for p in procs:
+            p.start()
+        outcomes = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+    latencies = sorted(l for o in outcomes for l in o["latencies"])
+    committed = len(latencies)
+    elapsed = max(o["elapsed"] for o in outcomes)
+    return {
+        "profile": profile,
+        "committed": committed,
+        "locked": sum(o["locked"] for o in outcomes),
+        "other_errors": sum(o["other"] for o in outcomes),
+        "tx_per_s": committed / elapsed if elapsed else 0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=200, help="Transactions per writer")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--profiles", nargs="+", choices=["default", "tuned"], default=["default", "tuned"])
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers x {args.ops} check-in transactions")
+    print(f"{'profile':<9} {'committed':>9} {'locked':>7} {'other':>6} {'tx/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for profile in args.profiles:
+        r = run(profile, args.writers, args.ops, args.students)
+        print(f"{r['profile']:<9} {r['committed']:>9} {r['locked']:>7} {r['other_errors']:>6} "
+              f"{r['tx_per_s']:>8.0f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()